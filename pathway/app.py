@@ -10,13 +10,22 @@ Run in WSL2 Ubuntu with:
 """
 
 import os
+import re
+import gzip
 import json
+import base64
+import atexit
 import time
+import random
+import hashlib
 import logging
 import threading
 import requests
-from datetime import datetime
-from typing import List, Dict, Any
+from collections import deque
+from itertools import islice
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import List, Dict, Any, Tuple
 from warnings import warn
 
 import pathway as pw
@@ -24,9 +33,12 @@ from pathway.xpacks.llm.question_answering import SummaryQuestionAnswerer
 from pathway.xpacks.llm.servers import QASummaryRestServer
 from pydantic import BaseModel, ConfigDict, InstanceOf
 from dotenv import load_dotenv
-from aiohttp import web
+from aiohttp import web, ClientSession
 import asyncio
 
+import incident_connector
+from incident_connector import SNAPSHOT_PATH
+
 # Load environment variables
 env_path = os.path.join(os.path.dirname(__file__), '..', '.env')
 if os.path.exists(env_path):
@@ -38,8 +50,21 @@ else:
 SUPABASE_URL = os.environ.get("SUPABASE_URL", "")
 SUPABASE_KEY = os.environ.get("SUPABASE_ANON_KEY", "")
 POLLING_INTERVAL = int(os.environ.get("PATHWAY_POLL_INTERVAL", "5"))
+# Adaptive polling: tighten while incidents change, relax when idle, back off on errors
+POLL_MIN_INTERVAL = float(os.environ.get("PATHWAY_POLL_MIN_INTERVAL", "1"))
+POLL_MAX_INTERVAL = float(os.environ.get("PATHWAY_POLL_MAX_INTERVAL", "30"))
+POLL_ERROR_MAX_INTERVAL = float(os.environ.get("PATHWAY_POLL_ERROR_MAX_INTERVAL", "120"))
+POLL_JITTER = float(os.environ.get("PATHWAY_POLL_JITTER", "0.1"))
+PAGE_SIZE = int(os.environ.get("PATHWAY_PAGE_SIZE", "1000"))
+# Re-read this many seconds before the watermark: updated_at is set by the
+# writer, so a late commit or clock skew can land a row behind the watermark
+WATERMARK_LOOKBACK = float(os.environ.get("PATHWAY_WATERMARK_LOOKBACK", "10"))
+INGEST_MODE = os.environ.get("PATHWAY_INGEST_MODE", "poll")  # poll | cdc
+# Sync-state snapshot interval (SNAPSHOT_PATH comes from incident_connector)
+SNAPSHOT_INTERVAL = float(os.environ.get("PATHWAY_SNAPSHOT_INTERVAL", "60"))
 CACHE_DIR = os.path.expanduser("~/pathway-cache")
 INCIDENTS_PORT = 8082  # Separate port for incidents API
+STATISTICS_URL = "http://localhost:8081/v1/statistics"  # RAG index stats (last_indexed)
 
 # Pathway license
 pw.set_license_key("demo-license-key-with-telemetry")
@@ -54,38 +79,227 @@ logger = logging.getLogger(__name__)
 
 # Global incidents cache (updated by poller)
 cached_incidents: List[Dict[str, Any]] = []
+# Version of the incident set, changes whenever the poller sees new data
+incidents_version: str = ""
+
+# Incremental sync state: active incidents by ID + (updated_at, incident_id) watermark
+incidents_by_id: Dict[str, Dict[str, Any]] = {}
+watermark: Tuple[str, str] = ("", "")
+# True once the source (Supabase or the CDC snapshot) has been read since startup;
+# until then the published set may be a restored snapshot or empty
+source_synced = False
+
+
+def mark_source_synced():
+    global source_synced
+    if not source_synced:
+        source_synced = True
+        logger.info("✓ Incident set synced with the source")
+
+
+@dataclass(frozen=True)
+class IncidentSnapshot:
+    """
+    Immutable /incidents payload, serialized and gzipped once per published
+    version so each request is a byte copy instead of a JSON encode. The
+    version (and ETag) is a hash of the body, so any content change - also
+    rows that land behind the sync watermark - yields a new one.
+    """
+    seq: int
+    version: str
+    body: bytes
+    gzip_body: bytes
+
+    @property
+    def etag(self) -> str:
+        return f'"{self.version}"'
+
+
+def build_snapshot(seq: int, incidents: List[Dict[str, Any]]) -> IncidentSnapshot:
+    body = json.dumps(incidents, default=str, separators=(",", ":")).encode("utf-8")
+    version = hashlib.sha256(body).hexdigest()[:16]
+    return IncidentSnapshot(seq, version, body, gzip.compress(body, compresslevel=6))
 
 
-def fetch_incidents_from_supabase() -> List[Dict[str, Any]]:
-    """Fetch all incidents from Supabase REST API."""
+# Nothing published yet: an empty version tells FastAPI the set is unknown
+incidents_snapshot = IncidentSnapshot(0, "", b"[]", gzip.compress(b"[]"))
+
+
+def lookback_mark(mark: Tuple[str, str]) -> Tuple[str, str]:
+    """Keyset start WATERMARK_LOOKBACK seconds before the watermark (updated_at >= start)."""
+    if not mark[0] or WATERMARK_LOOKBACK <= 0:
+        return mark
+    try:
+        start = datetime.fromisoformat(mark[0].replace("Z", "+00:00"))
+    except ValueError:
+        return mark
+    return (start - timedelta(seconds=WATERMARK_LOOKBACK)).isoformat(), ""
+
+
+def fetch_incident_changes(since: Tuple[str, str]) -> List[Dict[str, Any]]:
+    """
+    Fetch incidents changed after the (updated_at, incident_id) watermark,
+    re-reading a WATERMARK_LOOKBACK window before it. Rows seen before are
+    no-ops in apply_incident_changes().
+    Pages through keyset-ordered results so there is no row ceiling.
+    Soft-deleted rows are included so they can be retracted; the initial
+    load (empty watermark) skips them.
+    """
     if not SUPABASE_URL or not SUPABASE_KEY:
         logger.warning("Supabase credentials not configured")
         return []
     
+    url = f"{SUPABASE_URL}/rest/v1/incidents"
+    headers = {
+        "apikey": SUPABASE_KEY,
+        "Authorization": f"Bearer {SUPABASE_KEY}",
+        "Content-Type": "application/json"
+    }
+    changes: List[Dict[str, Any]] = []
+    cursor = lookback_mark(since)
+    
     try:
-        url = f"{SUPABASE_URL}/rest/v1/incidents"
-        headers = {
-            "apikey": SUPABASE_KEY,
-            "Authorization": f"Bearer {SUPABASE_KEY}",
-            "Content-Type": "application/json"
-        }
-        params = {
-            "select": "*",
-            "order": "created_at.desc",  # Order by when added to DB, not incident timestamp
-            "limit": "1000",  # Explicit high limit to get all incidents
-            "deleted_at": "is.null"  # Exclude soft-deleted incidents
-        }
-        
-        response = requests.get(url, headers=headers, params=params, timeout=10)
-        response.raise_for_status()
-        
-        incidents = response.json()
-        logger.info(f"✓ Fetched {len(incidents)} incidents from Supabase")
-        return incidents
-        
+        while True:
+            params = {
+                "select": "*",
+                "order": "updated_at.asc,incident_id.asc",
+                "limit": str(PAGE_SIZE),
+            }
+            if cursor[0]:
+                params["or"] = (
+                    f'(updated_at.gt."{cursor[0]}",'
+                    f'and(updated_at.eq."{cursor[0]}",incident_id.gt."{cursor[1]}"))'
+                )
+            else:
+                params["deleted_at"] = "is.null"  # Initial load: active only
+                if cursor[1]:
+                    params["incident_id"] = f'gt.{cursor[1]}'
+            
+            response = requests.get(url, headers=headers, params=params, timeout=10)
+            response.raise_for_status()
+            page = response.json()
+            changes.extend(page)
+            if len(page) < PAGE_SIZE:
+                break
+            last = page[-1]
+            cursor = (last.get("updated_at") or "", last.get("incident_id", ""))
     except Exception as e:
         logger.error(f"Error fetching from Supabase: {e}")
-        return []
+        if not changes:
+            raise  # Nothing fetched: let the poller back off
+        # Otherwise keep what we already have; the watermark only advances past it
+    
+    if changes:
+        logger.info(f"✓ Fetched {len(changes)} changed incidents from Supabase")
+    return changes
+
+
+def apply_incident_changes(changes: List[Dict[str, Any]],
+                           advance_watermark: bool = True) -> Tuple[List[str], List[str]]:
+    """Apply per-row upserts/retractions; returns (upserted_ids, removed_ids)."""
+    global watermark
+    upserted, removed = [], []
+    for row in changes:
+        inc_id = row.get("incident_id", row.get("id"))
+        if not inc_id:
+            continue
+        if row.get("deleted_at"):
+            if incidents_by_id.pop(inc_id, None) is not None:
+                removed.append(inc_id)
+        else:
+            # Merge so partial rows (e.g. CDC with unchanged TOAST columns) keep old fields
+            previous = incidents_by_id.get(inc_id, {})
+            merged = {**previous, **row}
+            if merged != previous:  # Unchanged rows come back from the lookback window
+                incidents_by_id[inc_id] = merged
+                upserted.append(inc_id)
+        mark = (row.get("updated_at") or "", inc_id)
+        if advance_watermark and mark > watermark:
+            watermark = mark
+    return upserted, removed
+
+
+def incident_sort_key(inc: Dict[str, Any]) -> Tuple[str, str]:
+    """Keyset order of the incident list: (created_at, incident_id), newest first."""
+    return str(inc.get("created_at", "")), str(inc.get("incident_id", ""))
+
+
+def publish_incidents():
+    """Rebuild the ordered cache, version and serialized snapshot after changes were applied."""
+    global cached_incidents, incidents_version, incidents_snapshot
+    cached_incidents = sorted(
+        incidents_by_id.values(),
+        key=incident_sort_key,
+        reverse=True  # Order by when added to DB, not incident timestamp
+    )
+    incidents_snapshot = build_snapshot(incidents_snapshot.seq + 1, cached_incidents)
+    incidents_version = incidents_snapshot.version
+    logger.info(
+        f"🔖 Incident set version: {incidents_version} "
+        f"(#{incidents_snapshot.seq}, {len(incidents_snapshot.body)} bytes, "
+        f"{len(incidents_snapshot.gzip_body)} gzipped)"
+    )
+
+
+def sync_incidents(cache_dir: str) -> bool:
+    """Run one incremental sync; returns True if anything changed."""
+    return apply_and_publish(fetch_incident_changes(watermark), cache_dir)
+
+
+# Serializes apply/publish between the poller/CDC thread and /ingest
+sync_lock = threading.Lock()
+# Read-your-writes tracking: inc_id -> (updated_at applied, epoch pushed to index or 0)
+index_pushes: Dict[str, Tuple[str, float]] = {}
+
+
+def apply_and_publish(changes: List[Dict[str, Any]], cache_dir: str,
+                      advance_watermark: bool = True) -> bool:
+    """
+    Apply changed rows (from polling, CDC or FastAPI's /ingest) and push them
+    to the index. Pushed writes never advance the poll watermark, so rows
+    written by other clients in between are still picked up.
+    """
+    if not changes:
+        return False
+    with sync_lock:
+        upserted, removed = apply_incident_changes(changes, advance_watermark)
+        if not upserted and not removed:
+            return False
+        publish_incidents()
+        pushed_at = time.time()
+        if incident_connector.is_active():
+            pushed = push_incidents_to_connector(upserted, removed)
+        else:
+            pushed = write_incidents_to_files(cache_dir, cached_incidents)
+        # Removals are absorbed once applied: the index statistics only track
+        # live documents (last_indexed never moves for a deletion)
+        pushed = set(pushed) - set(removed)
+        for row in changes:
+            inc_id = row.get("incident_id", row.get("id"))
+            if not inc_id:
+                continue
+            updated_at = row.get("updated_at") or ""
+            previous = index_pushes.get(inc_id)
+            if inc_id not in pushed and previous and previous[0] == updated_at:
+                continue  # Same version re-applied (e.g. poll after /ingest)
+            index_pushes[inc_id] = (updated_at, pushed_at if inc_id in pushed else 0.0)
+    logger.info(f"🔄 Applied {len(upserted)} upserts, {len(removed)} retractions")
+    return True
+
+
+def consistency_state(token: str) -> Tuple[str, float]:
+    """
+    State of a write token "<incident_id>@<updated_at>" returned by FastAPI:
+    ("pending", 0) until the row is applied, ("indexing", pushed_at) while
+    the index embeds the new document, ("absorbed", 0) once nothing is left.
+    """
+    inc_id, _, updated_at = token.partition("@")
+    entry = index_pushes.get(inc_id)
+    if entry is None or entry[0] < updated_at:
+        return "pending", 0.0
+    if entry[1] == 0.0:
+        return "absorbed", 0.0
+    return "indexing", entry[1]
 
 
 def format_incident_as_text(incident: Dict[str, Any]) -> str:
@@ -105,77 +319,284 @@ Timestamp: {incident.get('timestamp', 'N/A')}
 ---"""
 
 
-def write_incidents_to_files(cache_dir: str):
-    """Write incidents to individual text files for Pathway to read."""
+CANONICAL_ID_PATTERN = re.compile(r'^INC-\d{8}-\d{6}$')
+LEGACY_ID_PATTERN = re.compile(r'^INC-\d+$')
+
+
+def is_legacy_incident_id(inc_id: str) -> bool:
+    """Legacy IDs (INC-101) are never indexed - they must be migrated."""
+    return bool(LEGACY_ID_PATTERN.match(inc_id)) and not CANONICAL_ID_PATTERN.match(inc_id)
+
+
+def incident_metadata(incident: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Document metadata attached to each indexed incident. The structured
+    fields are what server.py's retrieval filters (JMESPath) match on, so
+    they are normalized to lowercase like its query vocabulary.
+    """
+    inc_id = incident.get("incident_id", incident.get("id", "unknown"))
+    return {
+        "path": f"{inc_id}.txt",
+        "incident_id": inc_id,
+        "organization_id": incident.get("organization_id"),
+        "severity": str(incident.get("severity") or "").lower() or None,
+        "status": str(incident.get("status") or "").lower() or None,
+        "location": str(incident.get("location") or "").lower() or None,
+        # Not "created_at": the fs reader sets that to the file creation time
+        "incident_created_at": _epoch(incident.get("timestamp") or incident.get("created_at")),
+        "modified_at": _epoch(incident.get("updated_at")),
+        "seen_at": int(time.time()),
+    }
+
+
+def _epoch(value: Any) -> int:
+    """ISO timestamp -> epoch seconds (the fs reader's metadata convention)."""
+    try:
+        return int(datetime.fromisoformat(str(value).replace("Z", "+00:00")).timestamp())
+    except ValueError:
+        return int(time.time())
+
+
+# Content hash of each document sent to the connector (inc_id -> sha256)
+pushed_hashes: Dict[str, str] = {}
+
+
+def push_incidents_to_connector(upserted: List[str], removed: List[str]) -> List[str]:
+    """Send per-row changes to the in-process Pathway connector; returns upserted IDs sent."""
+    pushed = []
+    for inc_id in removed:
+        incident_connector.remove(inc_id)
+        pushed_hashes.pop(inc_id, None)
+    for inc_id in dict.fromkeys(upserted):
+        incident = incidents_by_id.get(inc_id)
+        if incident is None:
+            continue  # Upserted then deleted within the same batch
+        if is_legacy_incident_id(inc_id):
+            logger.warning(f"⚠️  LEGACY ID DETECTED: {inc_id} - This should be migrated!")
+            continue
+        text = format_incident_as_text(incident)
+        digest = _content_hash(text)
+        if pushed_hashes.get(inc_id) == digest:
+            continue  # Unchanged document: no re-embedding
+        incident_connector.upsert(inc_id, text, incident_metadata(incident))
+        pushed_hashes[inc_id] = digest
+        pushed.append(inc_id)
+    return pushed
+
+
+# Content hash of each incident file currently on disk (inc_id -> sha256)
+written_hashes: Dict[str, str] = {}
+
+
+def _content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _atomic_write(cache_dir: str, filename: str, text: str):
+    """
+    Write via temp file + rename so the fs reader never sees a partial file.
+    The temp file lives in a sibling directory so Pathway does not pick it up.
+    """
+    tmp_dir = cache_dir.rstrip(os.sep) + ".tmp"
+    os.makedirs(tmp_dir, exist_ok=True)
+    tmp_path = os.path.join(tmp_dir, filename)
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_path, os.path.join(cache_dir, filename))
+
+
+def write_incidents_to_files(cache_dir: str, incidents: List[Dict[str, Any]]) -> List[str]:
+    """
+    Sync incident text files for Pathway to read.
+    Only files whose content changed are rewritten and only removed incidents
+    are deleted, so the streaming reader re-embeds just the changed documents.
+    Returns the IDs whose files were (re)written.
+    """
     os.makedirs(cache_dir, exist_ok=True)
+    placeholder = os.path.join(cache_dir, "placeholder.txt")
     
-    incidents = fetch_incidents_from_supabase()
+    legacy_count = 0
+    written_ids = []
+    unchanged = 0
+    wanted = set()
     
     if not incidents:
-        # Create a placeholder file
-        placeholder = os.path.join(cache_dir, "placeholder.txt")
-        with open(placeholder, "w") as f:
-            f.write("No incidents loaded yet. Waiting for data from Supabase.")
-        return
-    
-    # Clear old files
-    for f in os.listdir(cache_dir):
-        if f.endswith(".txt"):
-            os.remove(os.path.join(cache_dir, f))
+        # Create a placeholder file (files of deleted incidents are still removed below)
+        wanted.add("placeholder.txt")
+        if not os.path.exists(placeholder):
+            _atomic_write(cache_dir, "placeholder.txt",
+                          "No incidents loaded yet. Waiting for data from Supabase.")
+    elif os.path.exists(placeholder):
+        os.remove(placeholder)
     
-    # RUNTIME VALIDATION: Check for legacy IDs
-    import re
-    canonical_pattern = re.compile(r'^INC-\d{8}-\d{6}$')
-    legacy_pattern = re.compile(r'^INC-\d+$')
-    
-    legacy_count = 0
-    valid_count = 0
-    
-    # Write each incident as a text file
+    # Write each changed incident as a text file
     for inc in incidents:
         inc_id = inc.get("incident_id", inc.get("id", "unknown"))
         
         # VALIDATION: Detect legacy IDs
-        if legacy_pattern.match(inc_id) and not canonical_pattern.match(inc_id):
+        if is_legacy_incident_id(inc_id):
             logger.warning(f"⚠️  LEGACY ID DETECTED: {inc_id} - This should be migrated!")
             legacy_count += 1
             continue  # Skip writing legacy incidents to cache
         
-        filepath = os.path.join(cache_dir, f"{inc_id}.txt")
-        with open(filepath, "w", encoding="utf-8") as f:
-            f.write(format_incident_as_text(inc))
-        valid_count += 1
+        filename = f"{inc_id}.txt"
+        wanted.add(filename)
+        text = format_incident_as_text(inc)
+        digest = _content_hash(text)
+        
+        if inc_id not in written_hashes:
+            # First sight since startup: trust an identical file already on disk
+            filepath = os.path.join(cache_dir, filename)
+            if os.path.exists(filepath):
+                with open(filepath, encoding="utf-8") as f:
+                    written_hashes[inc_id] = _content_hash(f.read())
+        
+        if written_hashes.get(inc_id) == digest:
+            unchanged += 1
+            continue
+        _atomic_write(cache_dir, filename, text)
+        written_hashes[inc_id] = digest
+        written_ids.append(inc_id)
     
-    logger.info(f"📁 Wrote {valid_count} incident files to {cache_dir}")
+    # Delete files for incidents that are gone
+    removed = 0
+    for f in os.listdir(cache_dir):
+        if f.endswith(".txt") and f not in wanted:
+            os.remove(os.path.join(cache_dir, f))
+            written_hashes.pop(f[:-4], None)
+            removed += 1
+    
+    logger.info(f"📁 Synced {cache_dir}: {len(written_ids)} written, {removed} removed, {unchanged} unchanged")
     
     if legacy_count > 0:
         logger.error(f"❌ SKIPPED {legacy_count} incidents with legacy IDs - Run migration!")
+    
+    return written_ids
+
+
+# Poller metrics (served on /health)
+poller_stats: Dict[str, Any] = {
+    "interval": float(POLLING_INTERVAL),
+    "changes_per_minute": 0.0,
+    "consecutive_errors": 0,
+    "last_poll": None,
+}
+
+
+def next_poll_interval(interval: float, changed: bool, errors: int) -> float:
+    """
+    Adaptive schedule: halve toward the floor after a change, grow by 1.5x
+    toward the ceiling when idle, and back off exponentially on errors.
+    """
+    if errors:
+        return min(POLL_ERROR_MAX_INTERVAL, max(interval, POLLING_INTERVAL) * 2)
+    if changed:
+        return max(POLL_MIN_INTERVAL, interval / 2)
+    return min(POLL_MAX_INTERVAL, interval * 1.5)
 
 
 def start_supabase_poller(cache_dir: str):
-    """Start background thread to poll Supabase."""
-    global cached_incidents
-    last_hash = ""
+    """Start background thread to poll Supabase on an adaptive schedule."""
     
     def poll_loop():
-        global cached_incidents
-        nonlocal last_hash
+        interval = float(POLLING_INTERVAL)
+        change_times = deque()
         while True:
+            changed = False
             try:
-                incidents = fetch_incidents_from_supabase()
-                if incidents:
-                    current_hash = str(hash(json.dumps(incidents, sort_keys=True, default=str)))
-                    if current_hash != last_hash:
-                        cached_incidents = incidents  # Update global cache
-                        write_incidents_to_files(cache_dir)
-                        last_hash = current_hash
+                changed = sync_incidents(cache_dir)
+                mark_source_synced()
+                poller_stats["consecutive_errors"] = 0
             except Exception as e:
+                poller_stats["consecutive_errors"] += 1
                 logger.error(f"Polling error: {e}")
-            time.sleep(POLLING_INTERVAL)
+            
+            now = time.time()
+            if changed:
+                change_times.append(now)
+            while change_times and now - change_times[0] > 300:
+                change_times.popleft()
+            
+            interval = next_poll_interval(interval, changed, poller_stats["consecutive_errors"])
+            poller_stats.update(
+                interval=round(interval, 2),
+                changes_per_minute=round(len(change_times) / 5, 2),
+                last_poll=datetime.now().isoformat(),
+            )
+            time.sleep(interval * random.uniform(1 - POLL_JITTER, 1 + POLL_JITTER))
     
     thread = threading.Thread(target=poll_loop, daemon=True)
     thread.start()
-    logger.info(f"📡 Started Supabase polling (interval: {POLLING_INTERVAL}s)")
+    logger.info(
+        f"📡 Started Supabase polling (interval: {POLLING_INTERVAL}s, "
+        f"adaptive {POLL_MIN_INTERVAL}-{POLL_MAX_INTERVAL}s)"
+    )
+
+
+# ============================================================
+# Sync-State Snapshot (fast cold start)
+# ============================================================
+
+_snapshot_version = ""
+
+
+def save_sync_snapshot():
+    """Atomically persist incidents_by_id + watermark so a restart only replays newer changes."""
+    global _snapshot_version
+    with sync_lock:
+        if incidents_version == _snapshot_version:
+            return
+        payload = {
+            "watermark": list(watermark),
+            "version": incidents_version,
+            "saved_at": datetime.now().isoformat(),
+            "incidents": incidents_by_id,
+        }
+        os.makedirs(os.path.dirname(os.path.abspath(SNAPSHOT_PATH)), exist_ok=True)
+        tmp_path = SNAPSHOT_PATH + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(payload, f, default=str)
+        os.replace(tmp_path, SNAPSHOT_PATH)
+        _snapshot_version = incidents_version
+    logger.info(f"💾 Saved sync snapshot ({len(incidents_by_id)} incidents, version {incidents_version})")
+
+
+def load_sync_snapshot() -> bool:
+    """Restore the last snapshot; returns False if there is none."""
+    global watermark, _snapshot_version
+    if not os.path.exists(SNAPSHOT_PATH):
+        return False
+    try:
+        with open(SNAPSHOT_PATH, encoding="utf-8") as f:
+            payload = json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable sync snapshot: {e}")
+        return False
+    incidents_by_id.clear()
+    incidents_by_id.update(payload.get("incidents", {}))
+    watermark = tuple(payload.get("watermark", ("", "")))
+    publish_incidents()
+    _snapshot_version = incidents_version
+    logger.info(
+        f"♻️  Restored {len(incidents_by_id)} incidents from snapshot "
+        f"({payload.get('saved_at')}), replaying changes after {watermark[0] or 'start'}"
+    )
+    return True
+
+
+def start_snapshotter():
+    """Save the sync snapshot periodically and on shutdown."""
+    def snapshot_loop():
+        while True:
+            time.sleep(SNAPSHOT_INTERVAL)
+            try:
+                save_sync_snapshot()
+            except Exception as e:
+                logger.error(f"Snapshot error: {e}")
+    
+    atexit.register(save_sync_snapshot)
+    thread = threading.Thread(target=snapshot_loop, daemon=True)
+    thread.start()
 
 
 class App(BaseModel):
@@ -232,15 +653,183 @@ class App(BaseModel):
 # ============================================================
 
 async def handle_incidents(request):
-    """Return cached incidents as JSON."""
-    return web.json_response(cached_incidents)
+    """
+    Return the pre-serialized incidents snapshot. Clients that send the
+    current ETag in If-None-Match get a 304 with no body.
+    With paging/filter parameters, returns one filtered page instead.
+    """
+    if INCIDENT_QUERY_PARAMS & set(request.query):
+        try:
+            page, next_cursor = query_incidents(cached_incidents, request.query)
+        except ValueError as e:
+            return web.json_response({"error": f"Invalid query: {e}"}, status=400)
+        return web.json_response(
+            page,
+            dumps=lambda obj: json.dumps(obj, default=str),
+            headers={"X-Incidents-Version": incidents_version, "X-Next-Cursor": next_cursor}
+        )
+
+    snapshot = incidents_snapshot
+    headers = {
+        "ETag": snapshot.etag,
+        "X-Incidents-Version": snapshot.version,
+        # "false" while the set may still be partial (restored or not yet loaded)
+        "X-Incidents-Synced": "true" if source_synced else "false",
+        "Cache-Control": "no-cache",
+        "Vary": "Accept-Encoding",
+    }
+    if snapshot.etag in request.headers.get("If-None-Match", ""):
+        return web.Response(status=304, headers=headers)
+    body = snapshot.body
+    if "gzip" in request.headers.get("Accept-Encoding", ""):
+        body = snapshot.gzip_body
+        headers["Content-Encoding"] = "gzip"
+    return web.Response(body=body, content_type="application/json", headers=headers)
+
+
+# Query parameters that switch /incidents from the full snapshot to a filtered page
+INCIDENT_QUERY_PARAMS = {"limit", "cursor", "fields", "severity", "status", "location", "since", "until"}
+MAX_PAGE_SIZE = 1000
+
+
+def encode_cursor(key: Tuple[str, str]) -> str:
+    return base64.urlsafe_b64encode("|".join(key).encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    created_at, _, incident_id = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8").partition("|")
+    return created_at, incident_id
+
+
+def _aware_datetime(value: str) -> datetime:
+    """ISO timestamp -> timezone-aware datetime (naive values are taken as UTC)."""
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def query_incidents(incidents: List[Dict[str, Any]], params) -> Tuple[List[Dict[str, Any]], str]:
+    """
+    One page of the (created_at, incident_id)-descending incident list after
+    `cursor`, filtered and projected. Returns the rows and the next cursor
+    ("" on the last page). since/until are compared as instants, so offsets
+    ("+00:00" vs "Z" vs "+05:30") do not affect the result.
+    """
+    limit = int(params.get("limit", MAX_PAGE_SIZE))
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        raise ValueError(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+    severity = set(filter(None, params.get("severity", "").lower().split(",")))
+    status = set(filter(None, params.get("status", "").lower().split(",")))
+    location = params.get("location", "").lower()
+    since = _aware_datetime(params["since"]) if params.get("since") else None
+    until = _aware_datetime(params["until"]) if params.get("until") else None
+    fields = [f for f in params.get("fields", "").split(",") if f]
+
+    # Binary search for the first row after the cursor (list is sorted descending)
+    start = 0
+    if params.get("cursor"):
+        after = decode_cursor(params["cursor"])
+        lo, hi = 0, len(incidents)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if incident_sort_key(incidents[mid]) >= after:
+                lo = mid + 1
+            else:
+                hi = mid
+        start = lo
+
+    page: List[Dict[str, Any]] = []
+    next_cursor = ""
+    for inc in islice(incidents, start, None):
+        if since or until:
+            try:
+                created_at = _aware_datetime(str(inc.get("created_at", "")))
+            except ValueError:
+                continue  # No usable timestamp: cannot be inside the window
+            if until and created_at >= until:
+                continue
+            if since and created_at < since:
+                continue  # The list is ordered by string, so keep scanning
+        if severity and str(inc.get("severity", "")).lower() not in severity:
+            continue
+        if status and str(inc.get("status", "")).lower() not in status:
+            continue
+        if location and str(inc.get("location", "")).lower() != location:
+            continue
+        if len(page) == limit:
+            next_cursor = encode_cursor(incident_sort_key(page[-1]))
+            break
+        page.append(inc)
+
+    if fields:
+        page = [{f: inc.get(f) for f in fields} for inc in page]
+    return page, next_cursor
+
+
+async def handle_version(request):
+    """Current incident-set version (used by FastAPI to key its answer cache)."""
+    return web.json_response({
+        "version": incidents_version,
+        "synced": source_synced,
+        "seq": incidents_snapshot.seq,
+        "incidents_count": len(cached_incidents)
+    })
+
+
+async def handle_ingest(request):
+    """
+    Write-notify hook from FastAPI: apply the written row(s) immediately
+    instead of waiting for the next poll.
+    """
+    body = await request.json()
+    rows = body.get("rows") or ([body["row"]] if body.get("row") else [])
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(None, apply_and_publish, rows, CACHE_DIR, False)
+    return web.json_response({"applied": len(rows), "version": incidents_version})
+
+
+async def handle_ingest_wait(request):
+    """
+    Block (up to `timeout` seconds) until a write token is queryable: the row
+    is applied and the RAG index has indexed documents seen after it was pushed.
+    """
+    token = request.query.get("token", "")
+    try:
+        timeout = float(request.query.get("timeout", "10"))
+    except ValueError:
+        timeout = float("nan")
+    if not 0 <= timeout < float("inf"):  # Also rejects nan
+        return web.json_response({"error": "timeout must be a non-negative number"}, status=400)
+    timeout = min(timeout, 30.0)
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    
+    async with ClientSession() as session:
+        while True:
+            state, pushed_at = consistency_state(token)
+            if state == "indexing":
+                try:
+                    async with session.post(STATISTICS_URL, json={}, timeout=2) as resp:
+                        stats = await resp.json()
+                    if (stats.get("last_indexed") or 0) >= int(pushed_at):
+                        state = "absorbed"
+                except Exception:
+                    pass  # Statistics unavailable: keep waiting until timeout
+            if state == "absorbed" or loop.time() >= deadline:
+                return web.json_response({
+                    "absorbed": state == "absorbed",
+                    "state": state,
+                    "version": incidents_version
+                })
+            await asyncio.sleep(0.2)
 
 
 async def handle_health(request):
     """Health check."""
     return web.json_response({
         "status": "ok",
-        "incidents_count": len(cached_incidents)
+        "incidents_count": len(cached_incidents),
+        "version": incidents_version,
+        "poller": poller_stats
     })
 
 
@@ -249,6 +838,9 @@ def start_incidents_api():
     def run_server():
         app = web.Application()
         app.router.add_get('/incidents', handle_incidents)
+        app.router.add_get('/version', handle_version)
+        app.router.add_post('/ingest', handle_ingest)
+        app.router.add_get('/ingest/wait', handle_ingest_wait)
         app.router.add_get('/health', handle_health)
         
         loop = asyncio.new_event_loop()
@@ -269,33 +861,65 @@ def start_incidents_api():
 
 def main():
     """Main entry point."""
-    global cached_incidents
-    
     print("=" * 60)
     print("🚀 Incident Intelligence - REAL Pathway RAG Pipeline")
     print("=" * 60)
     print(f"Pathway Version: {pw.__version__}")
     print(f"Supabase: {SUPABASE_URL[:40]}..." if SUPABASE_URL else "Supabase: Not configured")
     print(f"Cache: {CACHE_DIR}")
+    print(f"Ingest: {INGEST_MODE}")
     print("=" * 60)
     
-    # Initial data fetch
-    write_incidents_to_files(CACHE_DIR)
-    cached_incidents = fetch_incidents_from_supabase()  # Initialize cache
-    
-    # Start background poller
-    start_supabase_poller(CACHE_DIR)
-    
-    # Start incidents REST API on port 8082
-    start_incidents_api()
-    
-    # Load YAML config and run Pathway RAG on port 8081
+    # Load YAML config first: building the pipeline tells us whether the
+    # in-process connector or the filesystem bridge is the document source
     yaml_path = os.path.join(os.path.dirname(__file__), "app.yaml")
     
     try:
         with open(yaml_path) as f:
             config = pw.load_yaml(f)
         app = App(**config)
+        
+        if incident_connector.is_active():
+            print("Source: in-process connector")
+        
+        # Restore the last sync snapshot so only newer changes are fetched;
+        # the connector index is in-memory, so re-send restored documents
+        # (the embedding cache turns these into hash lookups)
+        if load_sync_snapshot() and incident_connector.is_active():
+            push_incidents_to_connector(list(incidents_by_id), [])
+        
+        if INGEST_MODE == "cdc":
+            # Postgres logical replication: the consumer creates the slot, then
+            # loads the snapshot, then streams (retrying while Postgres is down)
+            import incident_cdc
+            changed = False
+        else:
+            # Initial data fetch (full load, then incremental from the watermark)
+            try:
+                changed = sync_incidents(CACHE_DIR)
+                mark_source_synced()
+            except Exception as e:
+                logger.error(f"Initial sync failed, poller will retry: {e}")
+                changed = False
+        if not changed:
+            publish_incidents()
+            if not incident_connector.is_active():
+                write_incidents_to_files(CACHE_DIR, cached_incidents)
+        
+        # Start background ingestion (CDC stream or Supabase poller)
+        if INGEST_MODE == "cdc":
+            incident_cdc.start_cdc_consumer(
+                lambda rows: apply_and_publish(rows, CACHE_DIR), on_snapshot=mark_source_synced
+            )
+        else:
+            start_supabase_poller(CACHE_DIR)
+        
+        # Start incidents REST API on port 8082
+        start_incidents_api()
+        
+        start_snapshotter()
+        
+        # Run Pathway RAG on port 8081
         app.run()
     except KeyboardInterrupt:
         print("\n👋 Shutting down...")
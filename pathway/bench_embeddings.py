@@ -0,0 +1,148 @@
+"""
+Incident Intelligence - Embedding Benchmark
+============================================
+Compares the current embedder (fp32 all-MiniLM-L6-v2) with the int8 ONNX
+export on a synthetic incident corpus: docs/sec for encoding, and recall@k of
+the quantized vectors' nearest neighbours against the fp32 ones. The shipped
+CachedSentenceTransformerEmbedder is also run, cold (every text a cache miss,
+micro-batched over the worker pool) and warm (every text a cache hit).
+
+Run in the Pathway environment:
+    python bench_embeddings.py --docs 5000 --queries 200
+"""
+
+import os
+import time
+import random
+import argparse
+import tempfile
+from typing import Any, Dict, List
+
+import numpy as np
+from sentence_transformers import SentenceTransformer
+
+from app import format_incident_as_text
+from embedding_cache import CachedSentenceTransformerEmbedder, EMBEDDING_WORKERS
+
+SEVERITIES = ["critical", "high", "medium", "low"]
+STATUSES = ["open", "investigating", "resolved"]
+LOCATIONS = ["Block A", "Block B", "Block C", "Data Center", "Server Room", "Lobby", "Warehouse"]
+SYSTEMS = ["core router", "db-primary-01", "auth service", "payment gateway", "HVAC unit",
+           "badge reader", "storage array", "VPN concentrator", "edge firewall", "k8s node pool"]
+SYMPTOMS = ["connection timeouts", "packet loss", "high CPU", "disk full", "replication lag",
+            "unauthorized access attempts", "overheating", "error 502 responses",
+            "certificate expiry", "memory leak"]
+
+
+def make_synthetic_incidents(n: int, seed: int = 7) -> List[Dict[str, Any]]:
+    """Deterministic synthetic incidents in the Supabase row shape."""
+    rng = random.Random(seed)
+    incidents = []
+    for i in range(n):
+        system, symptom = rng.choice(SYSTEMS), rng.choice(SYMPTOMS)
+        ts = f"2026-01-{1 + i % 28:02d}T{i % 24:02d}:{i % 60:02d}:{(i * 7) % 60:02d}+00:00"
+        incidents.append({
+            "incident_id": f"INC-202601{1 + i % 28:02d}-{i % 24:02d}{i % 60:02d}{(i * 7) % 60:02d}-{i}",
+            "title": f"{symptom.capitalize()} on {system}",
+            "description": (
+                f"Monitoring reported {symptom} on {system}. "
+                f"Error code E{rng.randint(100, 999)} seen on host {system.split()[0]}-{rng.randint(1, 40)}."
+            ),
+            "severity": rng.choice(SEVERITIES),
+            "status": rng.choice(STATUSES),
+            "location": rng.choice(LOCATIONS),
+            "timestamp": ts,
+            "created_at": ts,
+            "updated_at": ts,
+        })
+    return incidents
+
+
+def make_queries(n: int, seed: int = 11) -> List[str]:
+    rng = random.Random(seed)
+    return [
+        f"{rng.choice(SEVERITIES)} {rng.choice(SYMPTOMS)} on {rng.choice(SYSTEMS)} in {rng.choice(LOCATIONS)}"
+        for _ in range(n)
+    ]
+
+
+def encode(model: SentenceTransformer, texts: List[str], batch_size: int):
+    started = time.perf_counter()
+    vectors = model.encode(texts, batch_size=batch_size, normalize_embeddings=True)
+    elapsed = time.perf_counter() - started
+    return np.asarray(vectors, dtype=np.float32), len(texts) / elapsed
+
+
+def encode_cached(embedder: CachedSentenceTransformerEmbedder, texts: List[str]):
+    """Encode through the embedder's cache and worker pool, as the index does."""
+    started = time.perf_counter()
+    vectors = np.asarray(embedder.__wrapped__(texts), dtype=np.float32)
+    elapsed = time.perf_counter() - started
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors, len(texts) / elapsed
+
+
+def top_k(docs: np.ndarray, queries: np.ndarray, k: int) -> np.ndarray:
+    scores = queries @ docs.T
+    return np.argsort(-scores, axis=1)[:, :k]
+
+
+def recall_at_k(reference: np.ndarray, candidate: np.ndarray) -> float:
+    hits = sum(len(set(r) & set(c)) for r, c in zip(reference, candidate))
+    return hits / reference.size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default="all-MiniLM-L6-v2")
+    parser.add_argument("--onnx-file", default="onnx/model_qint8_avx512_vnni.onnx")
+    parser.add_argument("--docs", type=int, default=2000)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--workers", type=int, default=EMBEDDING_WORKERS)
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+
+    docs = [format_incident_as_text(inc) for inc in make_synthetic_incidents(args.docs)]
+    queries = make_queries(args.queries)
+
+    # Baseline: the model as configured before (one text at a time)
+    baseline = SentenceTransformer(args.model, device="cpu")
+    _, single_rate = encode(baseline, docs[:200], batch_size=1)
+
+    # Batched fp32
+    ref_docs, batched_rate = encode(baseline, docs, args.batch_size)
+    ref_queries, _ = encode(baseline, queries, args.batch_size)
+    reference = top_k(ref_docs, ref_queries, args.k)
+
+    # Batched int8 ONNX
+    quantized = SentenceTransformer(
+        args.model, device="cpu", backend="onnx", model_kwargs={"file_name": args.onnx_file}
+    )
+    q_docs, quantized_rate = encode(quantized, docs, args.batch_size)
+    q_queries, _ = encode(quantized, queries, args.batch_size)
+    quantized_recall = recall_at_k(reference, top_k(q_docs, q_queries, args.k))
+
+    # The shipped embedder (fp32) against an empty cache, then a warm one
+    with tempfile.TemporaryDirectory() as cache_dir:
+        embedder = CachedSentenceTransformerEmbedder(
+            args.model, cache_path=os.path.join(cache_dir, "embeddings.sqlite"),
+            batch_size=args.batch_size, workers=args.workers, device="cpu",
+        )
+        c_docs, cold_rate = encode_cached(embedder, docs)
+        _, warm_rate = encode_cached(embedder, docs)
+        c_queries = np.stack([encode_cached(embedder, [q])[0][0] for q in queries])
+        cached_recall = recall_at_k(reference, top_k(c_docs, c_queries, args.k))
+
+    print(f"\nCorpus: {args.docs} synthetic incidents, {args.queries} queries, k={args.k}")
+    print("-" * 60)
+    print(f"{'Embedder':<28}{'docs/sec':>12}{'recall@k':>12}")
+    print(f"{'fp32, batch=1':<28}{single_rate:>12.1f}{1.0:>12.3f}")
+    print(f"{f'fp32, batch={args.batch_size}':<28}{batched_rate:>12.1f}{1.0:>12.3f}")
+    print(f"{f'int8 ONNX, batch={args.batch_size}':<28}{quantized_rate:>12.1f}{quantized_recall:>12.3f}")
+    print(f"{f'cached, {args.workers} workers, cold':<28}{cold_rate:>12.1f}{cached_recall:>12.3f}")
+    print(f"{f'cached, {args.workers} workers, warm':<28}{warm_rate:>12.1f}{cached_recall:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+Incident Intelligence - Retrieval Benchmark
+============================================
+Recall@k and query cost of vector-only, BM25-only and hybrid (reciprocal
+rank fusion) retrieval on the synthetic incident corpus from
+bench_embeddings.py. Each retriever is built from the same factories as the
+retriever_factory options in app.yaml (ShardedUsearchKnnFactory,
+pw.indexing.TantivyBM25Factory, pw.indexing.HybridIndexFactory) and queried
+through Pathway's DataIndex.
+
+Query sets:
+  exact     - incident IDs, host names and error codes (where MiniLM is weak)
+  semantic  - paraphrased symptom/system descriptions
+
+Pathway answers the queries of a run as one batch, so per-query cost is the
+amortized difference between a run with all queries and a run with one
+(which leaves out index build time), not a per-request latency.
+
+Run in the Pathway environment:
+    python bench_retrieval.py --docs 5000 --queries 200
+"""
+
+import os
+import re
+import time
+import random
+import argparse
+import tempfile
+from statistics import mean
+from typing import Callable, Dict, List, Set, Tuple
+
+import pathway as pw
+from pathway.internals.parse_graph import G
+
+from app import format_incident_as_text
+from bench_embeddings import make_synthetic_incidents
+from embedding_cache import CachedSentenceTransformerEmbedder
+from sharded_index import ShardedUsearchKnnFactory
+
+PARAPHRASES = {
+    "connection timeouts": "requests hanging and timing out",
+    "packet loss": "dropped network packets",
+    "high CPU": "processor pegged at full utilisation",
+    "disk full": "no space left on the volume",
+    "replication lag": "replica falling behind the primary",
+    "unauthorized access attempts": "someone trying to break in",
+    "overheating": "temperature too high",
+    "error 502 responses": "bad gateway errors",
+    "certificate expiry": "TLS cert expired",
+    "memory leak": "memory usage growing until OOM",
+}
+
+
+class DocumentSchema(pw.Schema):
+    doc_id: int
+    text: str
+
+
+class QuerySchema(pw.Schema):
+    qid: int
+    query: str
+
+
+def make_queries(incidents: List[dict], n: int, seed: int = 13) -> Dict[str, List[Tuple[str, Set[int]]]]:
+    """Queries with their relevant document sets."""
+    rng = random.Random(seed)
+    exact, semantic = [], []
+    for _ in range(n):
+        i = rng.randrange(len(incidents))
+        inc = incidents[i]
+        code = re.search(r"E\d{3}", inc["description"]).group(0)
+        host = re.search(r"host (\S+)\.", inc["description"]).group(1)
+        exact.append(rng.choice([
+            (f"What happened in {inc['incident_id']}?", {i}),
+            (f"errors {code} on {host}", {
+                j for j, other in enumerate(incidents)
+                if code in other["description"] and f"host {host}." in other["description"]
+            }),
+        ]))
+
+        symptom = next(s for s in PARAPHRASES if s in inc["description"])
+        system = inc["title"].split(" on ", 1)[1]
+        relevant = {j for j, other in enumerate(incidents) if other["title"] == inc["title"]}
+        semantic.append((f"{PARAPHRASES[symptom]} on the {system}", relevant))
+    return {"exact": exact, "semantic": semantic}
+
+
+def recall(ranking: List[int], relevant: Set[int], k: int) -> float:
+    return len(set(ranking[:k]) & relevant) / min(k, len(relevant))
+
+
+def run_queries(make_factory: Callable, docs: List[str], queries: List[str], k: int) -> Tuple[List[List[int]], float]:
+    """Index docs with a fresh factory, answer all queries; returns (rankings, seconds)."""
+    G.clear()
+    started = time.perf_counter()
+    documents = pw.debug.table_from_rows(DocumentSchema, list(enumerate(docs)))
+    query_table = pw.debug.table_from_rows(QuerySchema, list(enumerate(queries)))
+    index = make_factory().build_index(documents.text, documents)
+    results = index.query_as_of_now(
+        query_table.query, number_of_matches=k, collapse_rows=True
+    ).select(qid=pw.left.qid, doc_ids=pw.right.doc_id)
+    frame = pw.debug.table_to_pandas(results)
+    elapsed = time.perf_counter() - started
+    by_qid = {int(row.qid): list(row.doc_ids or ()) for row in frame.itertuples()}
+    return [by_qid.get(qid, []) for qid in range(len(queries))], elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default="all-MiniLM-L6-v2")
+    parser.add_argument("--docs", type=int, default=2000)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--rrf-k", type=float, default=60.0)
+    args = parser.parse_args()
+
+    incidents = make_synthetic_incidents(args.docs)
+    docs = [format_incident_as_text(inc) for inc in incidents]
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        # The shipped embedder: repeated runs hit its cache instead of re-encoding
+        embedder = CachedSentenceTransformerEmbedder(
+            args.model, cache_path=os.path.join(cache_dir, "embeddings.sqlite"), device="cpu"
+        )
+        vector = lambda: ShardedUsearchKnnFactory(embedder=embedder, expected_size=len(docs))
+        bm25 = lambda: pw.indexing.TantivyBM25Factory(ram_budget=52428800, in_memory_index=True)
+        retrievers = {
+            "vector": vector,
+            "bm25": bm25,
+            "hybrid (rrf)": lambda: pw.indexing.HybridIndexFactory(
+                retriever_factories=[vector(), bm25()], k=args.rrf_k
+            ),
+        }
+
+        print(f"\nCorpus: {args.docs} synthetic incidents, k={args.k}")
+        print("-" * 72)
+        print(f"{'Retriever':<16}{'Query set':<12}{'recall@k':>12}{'build s':>12}{'ms/query':>12}")
+        for set_name, queries in make_queries(incidents, args.queries).items():
+            texts = [query for query, _ in queries]
+            for name, make_factory in retrievers.items():
+                _, baseline = run_queries(make_factory, docs, texts[:1], args.k)
+                rankings, elapsed = run_queries(make_factory, docs, texts, args.k)
+                per_query_ms = max(0.0, elapsed - baseline) * 1000 / max(1, len(texts) - 1)
+                score = mean(recall(r, relevant, args.k) for r, (_, relevant) in zip(rankings, queries))
+                print(f"{name:<16}{set_name:<12}{score:>12.3f}{baseline:>12.2f}{per_query_ms:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
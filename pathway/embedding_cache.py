@@ -0,0 +1,215 @@
+"""
+Incident Intelligence - Persistent Embedding Cache
+===================================================
+Disk-backed cache in front of SentenceTransformerEmbedder. Vectors are keyed
+by sha256(model name + document text), so restarts and rewrites of unchanged
+incidents cost a lookup instead of a transformer forward pass. Cache misses
+are micro-batched across a thread pool, optionally on an int8 ONNX model.
+
+Used from app.yaml:
+    $embedder: !embedding_cache.CachedSentenceTransformerEmbedder
+      model: "all-MiniLM-L6-v2"
+"""
+
+import os
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
+import numpy as np
+from pathway.xpacks.llm.embedders import SentenceTransformerEmbedder
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_CACHE_PATH = os.environ.get("PATHWAY_EMBEDDING_CACHE", "./Cache/embeddings.sqlite")
+EMBEDDING_CACHE_MAX_ENTRIES = int(os.environ.get("PATHWAY_EMBEDDING_CACHE_MAX", "200000"))
+EMBEDDING_BATCH_SIZE = int(os.environ.get("PATHWAY_EMBEDDING_BATCH_SIZE", "32"))
+EMBEDDING_WORKERS = int(os.environ.get("PATHWAY_EMBEDDING_WORKERS", str(min(4, os.cpu_count() or 1))))
+# Keys per SELECT ... IN (...), below SQLite's host-parameter limit
+LOOKUP_CHUNK = 500
+
+
+class EmbeddingCache:
+    """SQLite store of embedding vectors with least-recently-used eviction."""
+
+    def __init__(self, path: str, model: str, max_entries: int):
+        self.model = model
+        self.max_entries = max_entries
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " key TEXT PRIMARY KEY, vector BLOB NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS embeddings_lru ON embeddings(last_used)")
+        self._conn.commit()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.model}\0{text}".encode("utf-8")).hexdigest()
+
+    def get(self, text: str) -> Optional[np.ndarray]:
+        return self.get_many([text])[0]
+
+    def get_many(self, texts: List[str]) -> List[Optional[np.ndarray]]:
+        """Look up a batch of texts; hits get last_used bumped in one committed write."""
+        keys = [self.key(text) for text in texts]
+        found = {}
+        with self._lock:
+            for start in range(0, len(keys), LOOKUP_CHUNK):
+                chunk = keys[start:start + LOOKUP_CHUNK]
+                placeholders = ",".join("?" * len(chunk))
+                found.update(self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", chunk
+                ).fetchall())
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE embeddings SET last_used = ? WHERE key = ?",
+                    [(now, key) for key in found],
+                )
+                self._conn.commit()
+            hits = sum(1 for key in keys if key in found)
+            self.hits += hits
+            self.misses += len(keys) - hits
+        return [
+            np.frombuffer(found[key], dtype=np.float32).copy() if key in found else None
+            for key in keys
+        ]
+
+    def put_many(self, texts: List[str], vectors: List[np.ndarray]):
+        now = time.time()
+        rows = [
+            (self.key(text), np.asarray(vector, dtype=np.float32).tobytes(), now)
+            for text, vector in zip(texts, vectors)
+        ]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector, last_used) VALUES (?, ?, ?)",
+                rows,
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        count, = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()
+        if count <= self.max_entries:
+            return
+        # Drop the oldest 10% beyond the bound in one go
+        excess = count - self.max_entries + self.max_entries // 10
+        self._conn.execute(
+            "DELETE FROM embeddings WHERE key IN ("
+            " SELECT key FROM embeddings ORDER BY last_used ASC LIMIT ?)",
+            (excess,),
+        )
+        logger.info(f"🧹 Evicted {excess} cached embeddings")
+
+
+class CachedSentenceTransformerEmbedder(SentenceTransformerEmbedder):
+    """
+    SentenceTransformerEmbedder that consults EmbeddingCache before the model.
+    Cache misses are split into `batch_size` micro-batches and encoded on a
+    pool of `workers` threads; while the pool runs, each gets its share of the
+    CPU cores. Single texts (e.g. queries) keep all cores.
+    `quantized: true` loads the int8 ONNX export of the model instead.
+    """
+
+    def __init__(self, model: str, cache_path: str = EMBEDDING_CACHE_PATH,
+                 max_entries: int = EMBEDDING_CACHE_MAX_ENTRIES,
+                 batch_size: int = EMBEDDING_BATCH_SIZE,
+                 workers: int = EMBEDDING_WORKERS,
+                 quantized: bool = False,
+                 onnx_file: str = "onnx/model_qint8_avx512_vnni.onnx",
+                 call_kwargs: Optional[dict] = None, **kwargs):
+        if quantized:
+            # sentence-transformers >= 3.2: ONNX Runtime backend with the int8 export
+            kwargs.setdefault("backend", "onnx")
+            kwargs.setdefault("model_kwargs", {"file_name": onnx_file})
+        call_kwargs = {"batch_size": batch_size, **(call_kwargs or {})}
+        super().__init__(model, call_kwargs=call_kwargs, **kwargs)
+        
+        self.batch_size = batch_size
+        self.workers = max(1, workers)
+        self._pool = ThreadPoolExecutor(max_workers=self.workers) if self.workers > 1 else None
+        
+        # Quantized vectors differ from fp32 ones: keep them in separate keys
+        cache_model = f"{model}:onnx-int8" if quantized else model
+        self.embedding_cache = EmbeddingCache(cache_path, cache_model, max_entries)
+
+    def __wrapped__(self, input, **kwargs):
+        # Single text (unbatched embedder) or a list of texts (batched embedder)
+        if isinstance(input, str):
+            return self._embed_cached([input], batched=False, **kwargs)[0]
+        return self._embed_cached(list(input), batched=True, **kwargs)
+
+    def _embed_cached(self, texts: List[str], batched: bool, **kwargs) -> List[np.ndarray]:
+        results: List[Optional[np.ndarray]] = self.embedding_cache.get_many(texts)
+        missing = [i for i, vector in enumerate(results) if vector is None]
+        if missing:
+            missing_texts = [texts[i] for i in missing]
+            if batched:
+                vectors = self._encode_batches(missing_texts, **kwargs)
+            else:
+                vectors = [SentenceTransformerEmbedder.__wrapped__(self, missing_texts[0], **kwargs)]
+            self.embedding_cache.put_many(missing_texts, vectors)
+            for i, vector in zip(missing, vectors):
+                results[i] = vector
+        return results
+
+    def _encode_batches(self, texts: List[str], **kwargs) -> List[np.ndarray]:
+        batches = [texts[i:i + self.batch_size] for i in range(0, len(texts), self.batch_size)]
+        encode = lambda batch: list(SentenceTransformerEmbedder.__wrapped__(self, batch, **kwargs))
+        if self._pool is None or len(batches) == 1:
+            outputs = [encode(batch) for batch in batches]
+        else:
+            with _split_torch_threads(self.workers):
+                outputs = list(self._pool.map(encode, batches))
+        return [vector for batch in outputs for vector in batch]
+
+
+# torch's intra-op thread count is process-wide: it is only lowered while at
+# least one pooled encode runs, and restored when the last one finishes
+_threads_lock = threading.Lock()
+_pooled_encodes = 0
+_default_threads: Optional[int] = None
+
+
+@contextmanager
+def _split_torch_threads(workers: int):
+    """Give each of `workers` concurrent batches its share of the cores (avoids oversubscription)."""
+    global _pooled_encodes, _default_threads
+    with _threads_lock:
+        if _pooled_encodes == 0:
+            _default_threads = _get_torch_threads()
+            _set_torch_threads(max(1, (os.cpu_count() or 1) // workers))
+        _pooled_encodes += 1
+    try:
+        yield
+    finally:
+        with _threads_lock:
+            _pooled_encodes -= 1
+            if _pooled_encodes == 0 and _default_threads:
+                _set_torch_threads(_default_threads)
+
+
+def _get_torch_threads() -> Optional[int]:
+    try:
+        import torch
+        return torch.get_num_threads()
+    except ImportError:
+        return None
+
+
+def _set_torch_threads(threads: int):
+    try:
+        import torch
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
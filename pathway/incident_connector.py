@@ -0,0 +1,99 @@
+"""
+Incident Intelligence - In-process Pathway Connector
+=====================================================
+Streams incident upserts/deletes from the Supabase poller straight into the
+DocumentStore as keyed rows, replacing the ~/pathway-cache filesystem bridge.
+
+Select it in app.yaml:
+    $sources:
+      - !incident_connector.read_incidents {}
+
+The poller in app.py feeds it through upsert()/remove(); this module is
+imported by both app.py and the YAML loader so they share one subject (and
+one SNAPSHOT_PATH).
+"""
+
+import os
+import queue
+import logging
+from typing import Any, Dict, Optional, Tuple
+
+import pathway as pw
+
+logger = logging.getLogger(__name__)
+
+AUTOCOMMIT_MS = int(os.environ.get("PATHWAY_CONNECTOR_COMMIT_MS", "100"))
+# Sync-state snapshot for fast restarts (incidents + watermark), written by
+# app.py and read by sharded_index to size the vector index
+SNAPSHOT_PATH = os.environ.get("PATHWAY_SNAPSHOT_PATH", "./Cache/incidents_snapshot.json")
+
+
+class IncidentSchema(pw.Schema):
+    incident_id: str = pw.column_definition(primary_key=True)
+    text: str
+    metadata: pw.Json
+
+
+class IncidentSubject(pw.io.python.ConnectorSubject):
+    """
+    Pathway source fed from the poller thread through a queue.
+    An update retracts the previously sent row and inserts the new one,
+    so each incident is exactly one keyed row in the index.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._changes: "queue.Queue[Tuple[str, str, Optional[str], Optional[dict]]]" = queue.Queue()
+        self._sent: Dict[str, Dict[str, Any]] = {}
+
+    def run(self):
+        while True:
+            op, inc_id, text, metadata = self._changes.get()
+            previous = self._sent.pop(inc_id, None)
+            if previous is not None:
+                self._remove(None, previous)
+            if op == "upsert":
+                row = {"incident_id": inc_id, "text": text, "metadata": metadata}
+                self.next(**row)
+                self._sent[inc_id] = row
+            # Commit once the burst has been drained
+            if self._changes.empty():
+                self.commit()
+
+    def push(self, op: str, inc_id: str, text: Optional[str] = None,
+             metadata: Optional[dict] = None):
+        self._changes.put((op, inc_id, text, metadata))
+
+
+_subject: Optional[IncidentSubject] = None
+
+
+def read_incidents() -> pw.Table:
+    """Build the incident source table in the same shape as pw.io.fs.read(binary, with_metadata)."""
+    global _subject
+    _subject = IncidentSubject()
+    table = pw.io.python.read(
+        _subject,
+        schema=IncidentSchema,
+        autocommit_duration_ms=AUTOCOMMIT_MS,
+    )
+    logger.info("🔌 Using in-process incident connector (no filesystem bridge)")
+    return table.select(
+        data=pw.apply_with_type(lambda text: text.encode("utf-8"), bytes, pw.this.text),
+        _metadata=pw.this.metadata,
+    )
+
+
+def is_active() -> bool:
+    """True when app.yaml selected this connector as the document source."""
+    return _subject is not None
+
+
+def upsert(inc_id: str, text: str, metadata: dict):
+    if _subject is not None:
+        _subject.push("upsert", inc_id, text, metadata)
+
+
+def remove(inc_id: str):
+    if _subject is not None:
+        _subject.push("remove", inc_id)
@@ -0,0 +1,113 @@
+"""
+Incident Intelligence - Record Splitter
+========================================
+Indexes each incident as a single document instead of running it through
+TokenCountSplitter. Only descriptions longer than max_description_tokens are
+split, and every part repeats the header fields (ID, title, status, severity,
+location, timestamp), so any retrieved chunk identifies its incident.
+
+Used from app.yaml:
+    $splitter: !incident_splitter.IncidentRecordSplitter
+      max_description_tokens: 300
+"""
+
+import re
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from pathway.xpacks.llm.splitters import BaseSplitter
+
+# Rough token estimate for English text, avoids running a tokenizer per record
+CHARS_PER_TOKEN = 4
+SENTENCE_END = re.compile(r'(?<=[.!?])\s+')
+DESCRIPTION_PREFIX = "Description: "
+TRAILER_PREFIXES = ("Timestamp: ", "---")
+# Record lines copied into chunk metadata, matching app.incident_metadata()
+METADATA_FIELDS = {"Status: ": "status", "Severity: ": "severity", "Location: ": "location"}
+TIMESTAMP_PREFIX = "Timestamp: "
+
+
+def split_record(text: str) -> Tuple[List[str], str, List[str]]:
+    """Split format_incident_as_text() output into header lines, description, trailer lines."""
+    lines = text.split("\n")
+    start = next((i for i, line in enumerate(lines) if line.startswith(DESCRIPTION_PREFIX)), None)
+    if start is None:
+        return lines, "", []
+    end = next(
+        (i for i in range(start + 1, len(lines)) if lines[i].startswith(TRAILER_PREFIXES)),
+        len(lines),
+    )
+    description = "\n".join(lines[start:end])[len(DESCRIPTION_PREFIX):]
+    return lines[:start], description, lines[end:]
+
+
+def _epoch(value: str) -> Optional[int]:
+    try:
+        return int(datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp())
+    except ValueError:
+        return None
+
+
+def record_metadata(lines: List[str]) -> dict:
+    """
+    Filterable fields from the header/trailer lines. Documents read by the
+    fs source have no other structured metadata, so this is what lets
+    server.py's retrieval filters apply to them.
+    """
+    metadata = {}
+    for line in lines:
+        for prefix, key in METADATA_FIELDS.items():
+            value = line[len(prefix):].strip().lower()
+            if line.startswith(prefix) and value and value != "n/a":
+                metadata[key] = value
+        if line.startswith(TIMESTAMP_PREFIX):
+            created_at = _epoch(line[len(TIMESTAMP_PREFIX):].strip())
+            if created_at is not None:
+                metadata["incident_created_at"] = created_at
+    return metadata
+
+
+def chunk_description(description: str, max_chars: int) -> List[str]:
+    """Sentence-aligned parts of at most max_chars (long sentences are wrapped on spaces)."""
+    parts, current = [], ""
+    for sentence in SENTENCE_END.split(description.strip()):
+        while len(sentence) > max_chars:
+            cut = sentence.rfind(" ", 0, max_chars)
+            cut = cut if cut > 0 else max_chars
+            if current:
+                parts.append(current)
+                current = ""
+            parts.append(sentence[:cut])
+            sentence = sentence[cut:].lstrip()
+        if current and len(current) + 1 + len(sentence) > max_chars:
+            parts.append(current)
+            current = sentence
+        else:
+            current = f"{current} {sentence}" if current else sentence
+    if current:
+        parts.append(current)
+    return parts
+
+
+class IncidentRecordSplitter(BaseSplitter):
+    """One chunk per incident; long descriptions become several self-describing chunks."""
+
+    def __init__(self, max_description_tokens: int = 300):
+        super().__init__()
+        self.max_description_tokens = max_description_tokens
+
+    def __wrapped__(self, txt: str, **kwargs) -> List[Tuple[str, dict]]:
+        max_chars = self.max_description_tokens * CHARS_PER_TOKEN
+        header, description, trailer = split_record(txt)
+        metadata = record_metadata(header + trailer)
+        if len(description) <= max_chars:
+            return [(txt, metadata)]
+
+        parts = chunk_description(description, max_chars)
+        return [
+            (
+                "\n".join(header + [f"Description (part {i}/{len(parts)}): {part}"] + trailer),
+                {**metadata, "chunk": i, "chunks": len(parts)},
+            )
+            for i, part in enumerate(parts, start=1)
+        ]
@@ -0,0 +1,190 @@
+"""
+Incident Intelligence - Sharded USearch Index
+==============================================
+Drop-in replacement for pw.indexing.UsearchKnnFactory that:
+
+- sizes reserved_space from the expected corpus (next power of two with
+  headroom) instead of a fixed 1000, so growth happens in doublings;
+- exposes the HNSW tuning knobs (connectivity, expansion_add/search);
+- optionally splits the index into shards by time bucket or by
+  organization_id, fans every query out to all shards and merges the top-k
+  by score.
+
+Incidents created through server.py all carry DEFAULT_ORG_ID, so
+shard_by "organization_id" only spreads documents once several
+organizations write incidents; until then every document lands on one shard.
+
+Select it in app.yaml:
+    $retriever_factory: !sharded_index.ShardedUsearchKnnFactory
+      embedder: $embedder
+      shards: 4
+      shard_by: "time"
+"""
+
+import json
+import zlib
+import logging
+from dataclasses import dataclass
+from typing import Any, List, Optional, Tuple
+
+import pathway as pw
+from pathway.stdlib.indexing import UsearchKnnFactory, USearchMetricKind
+from pathway.stdlib.indexing.data_index import InnerIndex
+from pathway.stdlib.indexing.retrievers import InnerIndexFactory
+
+from incident_connector import SNAPSHOT_PATH
+
+logger = logging.getLogger(__name__)
+
+SHARD_KEYS = ("time", "organization_id")
+DAY_SECONDS = 86400
+
+
+def reserved_capacity(expected: int, headroom: float = 2.0, minimum: int = 1024) -> int:
+    """Smallest power of two holding expected * headroom vectors (at least minimum)."""
+    target = max(minimum, int(expected * headroom))
+    return 1 << (target - 1).bit_length()
+
+
+def estimate_corpus_size(chunks_per_doc: float = 1.0) -> int:
+    """Expected number of indexed chunks, taken from the poller's last sync snapshot."""
+    try:
+        with open(SNAPSHOT_PATH, encoding="utf-8") as f:
+            incidents = json.load(f).get("incidents", {})
+    except (OSError, ValueError):
+        return 0
+    return int(len(incidents) * chunks_per_doc)
+
+
+def _metadata_dict(metadata: Any) -> dict:
+    value = getattr(metadata, "value", metadata)
+    return value if isinstance(value, dict) else {}
+
+
+@dataclass(frozen=True)
+class ShardedIndex(InnerIndex):
+    """Fan-out over per-shard inner indexes; replies are merged by score (higher is closer)."""
+
+    data_column: pw.ColumnReference
+    metadata_column: Optional[pw.ColumnExpression]
+    shard_indexes: List[InnerIndex]
+
+    def query(self, query_column, *, number_of_matches=3, metadata_filter=None) -> pw.Table:
+        return self._fan_out(query_column, number_of_matches, metadata_filter, as_of_now=False)
+
+    def query_as_of_now(self, query_column, *, number_of_matches=3, metadata_filter=None) -> pw.Table:
+        return self._fan_out(query_column, number_of_matches, metadata_filter, as_of_now=True)
+
+    def _fan_out(self, query_column, number_of_matches, metadata_filter, as_of_now: bool) -> pw.Table:
+        replies = []
+        for shard in self.shard_indexes:
+            query = shard.query_as_of_now if as_of_now else shard.query
+            replies.append(query(query_column, number_of_matches=number_of_matches,
+                                 metadata_filter=metadata_filter))
+        first = replies[0]
+        return first.select(
+            _pw_index_reply=pw.apply(
+                _merge_replies,
+                number_of_matches,
+                first._pw_index_reply,
+                *[reply.with_universe_of(first)._pw_index_reply for reply in replies[1:]],
+            )
+        )
+
+
+def _merge_replies(k: int, *replies) -> Tuple[Tuple[pw.Pointer, float], ...]:
+    """Global top-k from per-shard top-k lists of (id, score)."""
+    matches = [match for reply in replies if reply for match in reply]
+    matches.sort(key=lambda match: match[1], reverse=True)
+    return tuple(matches[:k])
+
+
+class ShardedUsearchKnnFactory(InnerIndexFactory):
+    """
+    USearch HNSW index factory with capacity sizing, tuning and optional sharding.
+
+    Args:
+        shards: number of USearch indexes; 1 disables sharding.
+        shard_by: "time" (documents in the same time_bucket_days window share
+            a shard) or "organization_id" (hash of the document's org; one
+            shard while all incidents share DEFAULT_ORG_ID).
+        expected_size: expected chunk count; defaults to the sync snapshot size.
+        connectivity / expansion_add / expansion_search: HNSW M, efConstruction
+            and ef; 0 keeps the USearch defaults.
+    """
+
+    def __init__(
+        self,
+        embedder=None,
+        dimensions: Optional[int] = None,
+        metric: USearchMetricKind = USearchMetricKind.COS,
+        shards: int = 1,
+        shard_by: str = "time",
+        time_bucket_days: int = 30,
+        expected_size: Optional[int] = None,
+        headroom: float = 2.0,
+        min_reserved_space: int = 1024,
+        connectivity: int = 0,
+        expansion_add: int = 0,
+        expansion_search: int = 0,
+    ):
+        if shard_by not in SHARD_KEYS:
+            raise ValueError(f"shard_by must be one of {SHARD_KEYS}, got {shard_by!r}")
+        self.embedder = embedder
+        self.dimensions = dimensions
+        self.metric = metric
+        self.shards = max(1, int(shards))
+        self.shard_by = shard_by
+        self.time_bucket_seconds = max(1, int(time_bucket_days)) * DAY_SECONDS
+        self.connectivity = connectivity
+        self.expansion_add = expansion_add
+        self.expansion_search = expansion_search
+
+        if expected_size is None:
+            expected_size = estimate_corpus_size()
+        self.reserved_space = reserved_capacity(
+            expected_size // self.shards, headroom, min_reserved_space
+        )
+        logger.info(
+            f"🧭 USearch index: {self.shards} shard(s) by {self.shard_by}, "
+            f"reserved_space={self.reserved_space} each (expected {expected_size} chunks)"
+        )
+
+    def _shard_factory(self) -> UsearchKnnFactory:
+        return UsearchKnnFactory(
+            dimensions=self.dimensions,
+            reserved_space=self.reserved_space,
+            metric=self.metric,
+            connectivity=self.connectivity,
+            expansion_add=self.expansion_add,
+            expansion_search=self.expansion_search,
+            embedder=self.embedder,
+        )
+
+    def shard_of(self, metadata: Any) -> int:
+        meta = _metadata_dict(metadata)
+        if self.shard_by == "time":
+            bucket = int(meta.get("modified_at") or 0) // self.time_bucket_seconds
+            return bucket % self.shards
+        org = str(meta.get("organization_id") or "")
+        return zlib.crc32(org.encode("utf-8")) % self.shards
+
+    def build_inner_index(self, data_column, metadata_column=None) -> InnerIndex:
+        if self.shards == 1 or metadata_column is None:
+            return self._shard_factory().build_inner_index(data_column, metadata_column)
+
+        # Row ids are preserved by select/filter, so shard replies point into the original table
+        keyed = data_column.table.select(
+            data=data_column,
+            metadata=metadata_column,
+            _pw_shard=pw.apply_with_type(self.shard_of, int, metadata_column),
+        )
+        shard_indexes = []
+        for shard in range(self.shards):
+            part = keyed.filter(keyed._pw_shard == shard)
+            shard_indexes.append(self._shard_factory().build_inner_index(part.data, part.metadata))
+        return ShardedIndex(
+            data_column=data_column,
+            metadata_column=metadata_column,
+            shard_indexes=shard_indexes,
+        )
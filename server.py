@@ -11,15 +11,27 @@ NOTE: Pathway remains READ-ONLY. All writes go to Supabase via this server.
 """
 
 import os
+import json
+import math
+import heapq
+import base64
+import bisect
+import time
+import asyncio
 import logging
-from datetime import datetime
-from typing import List, Optional
+import importlib.util
+from collections import OrderedDict, deque
+from itertools import islice
+from functools import lru_cache
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
 from dotenv import load_dotenv
 
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException, Query
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException, Query, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-import requests
+import httpx
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -31,9 +43,45 @@ load_dotenv()
 # Configuration
 PATHWAY_URL = "http://localhost:8081/v2/answer"
 PATHWAY_INCIDENTS_URL = "http://localhost:8082/incidents"
+PATHWAY_VERSION_URL = "http://localhost:8082/version"
+PATHWAY_INGEST_URL = "http://localhost:8082/ingest"
+PATHWAY_INGEST_WAIT_URL = "http://localhost:8082/ingest/wait"
 SUPABASE_URL = os.getenv("SUPABASE_URL", "")
 SUPABASE_KEY = os.getenv("SUPABASE_ANON_KEY", "")
 
+# Shared HTTP client tuning (Supabase + Pathway incidents API)
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "20"))
+HTTP_KEEPALIVE = int(os.getenv("HTTP_KEEPALIVE", "10"))
+SUPABASE_TIMEOUT = float(os.getenv("SUPABASE_TIMEOUT", "10"))
+HTTP2_ENABLED = importlib.util.find_spec("h2") is not None
+
+# Pathway RAG proxy limits (keeps chat load from starving CRUD traffic)
+CHAT_MAX_INFLIGHT = int(os.getenv("CHAT_MAX_INFLIGHT", "4"))
+CHAT_MAX_QUEUE = int(os.getenv("CHAT_MAX_QUEUE", "16"))
+CHAT_RETRY_AFTER = int(os.getenv("CHAT_RETRY_AFTER", "5"))
+PATHWAY_TIMEOUT = float(os.getenv("PATHWAY_TIMEOUT", "120"))  # Groq cloud latency
+
+# Read-your-writes: max seconds /api/chat waits for a write to be indexed
+CONSISTENCY_WAIT_TIMEOUT = float(os.getenv("CONSISTENCY_WAIT_TIMEOUT", "10"))
+
+# Answer cache (keyed by normalized query + incident-set version)
+ANSWER_CACHE_SIZE = int(os.getenv("ANSWER_CACHE_SIZE", "256"))
+ANSWER_CACHE_TTL = float(os.getenv("ANSWER_CACHE_TTL", "300"))
+INCIDENTS_VERSION_TTL = float(os.getenv("INCIDENTS_VERSION_TTL", "1"))
+
+# Semantic answer cache (same embedder as pathway/app.yaml; optional dependency)
+SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE_ENABLED", "true").lower() == "true"
+SEMANTIC_CACHE_MODEL = os.getenv("SEMANTIC_CACHE_MODEL", "all-MiniLM-L6-v2")
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.9"))
+SEMANTIC_CACHE_SIZE = int(os.getenv("SEMANTIC_CACHE_SIZE", "128"))
+
+# Largest page /api/incidents returns with cursor pagination
+INCIDENT_PAGE_MAX = int(os.getenv("INCIDENT_PAGE_MAX", "1000"))
+
+# Delta sync: change log length and Pathway snapshot diff interval
+CHANGE_LOG_SIZE = int(os.getenv("CHANGE_LOG_SIZE", "1000"))
+INCIDENT_SYNC_INTERVAL = float(os.getenv("INCIDENT_SYNC_INTERVAL", "2"))
+
 # Default IDs until auth is implemented (Priority 4)
 # Using existing UUIDs from Supabase to pass RLS
 DEFAULT_ORG_ID = "24bae8af-2d39-4a91-ab94-59be032a8e23"
@@ -53,9 +101,51 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Changes-Version", "X-Next-Cursor"],
 )
 
 
+# ============================================================
+# Shared Async HTTP Client
+# ============================================================
+
+# One keep-alive pool shared by every handler, so CRUD calls reuse TLS
+# connections instead of blocking the event loop on a fresh handshake.
+http_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the shared AsyncClient, creating it on first use."""
+    global http_client
+    if http_client is None or http_client.is_closed:
+        http_client = httpx.AsyncClient(
+            http2=HTTP2_ENABLED,
+            timeout=httpx.Timeout(SUPABASE_TIMEOUT),
+            limits=httpx.Limits(
+                max_connections=HTTP_POOL_SIZE,
+                max_keepalive_connections=HTTP_KEEPALIVE,
+            ),
+        )
+    return http_client
+
+
+@app.on_event("startup")
+async def open_http_client():
+    get_http_client()
+    logger.info(
+        f"HTTP pool ready (size={HTTP_POOL_SIZE}, keepalive={HTTP_KEEPALIVE}, "
+        f"http2={'on' if HTTP2_ENABLED else 'off'})"
+    )
+
+
+@app.on_event("shutdown")
+async def close_http_client():
+    global http_client
+    if http_client is not None:
+        await http_client.aclose()
+        http_client = None
+
+
 # ============================================================
 # Supabase REST API Helper
 # ============================================================
@@ -70,18 +160,19 @@ def supabase_headers():
     }
 
 
-def supabase_request(method: str, endpoint: str, data: dict = None, params: dict = None):
-    """Make a request to Supabase REST API."""
+async def supabase_request(method: str, endpoint: str, data: dict = None,
+                           params: dict = None, timeout: float = None):
+    """Make a request to Supabase REST API over the shared connection pool."""
     url = f"{SUPABASE_URL}/rest/v1/{endpoint}"
-    response = requests.request(
+    response = await get_http_client().request(
         method=method,
         url=url,
         headers=supabase_headers(),
         json=data,
         params=params,
-        timeout=10
+        timeout=timeout if timeout is not None else SUPABASE_TIMEOUT
     )
-    if not response.ok:
+    if not response.is_success:
         raise HTTPException(status_code=response.status_code, detail=response.text)
     return response.json() if response.text else None
 
@@ -98,6 +189,7 @@ class ChatMessage(BaseModel):
 class ChatRequest(BaseModel):
     message: str
     history: List[ChatMessage] = []
+    consistencyToken: Optional[str] = None  # From a write; wait until indexed
 
 
 class ChatResponse(BaseModel):
@@ -137,6 +229,7 @@ class IncidentResponse(BaseModel):
     updatedAt: str
     timeline: List[dict] = []
     aiInsights: List[str] = []
+    consistencyToken: Optional[str] = None
 
 
 # ============================================================
@@ -159,6 +252,33 @@ def transform_incident(inc: dict) -> dict:
     }
 
 
+def consistency_token(inc: dict) -> str:
+    """Write token: the incident version a later chat must be able to see."""
+    return f"{inc.get('incident_id', inc.get('id'))}@{inc.get('updated_at', '')}"
+
+
+async def notify_pathway(inc: dict):
+    """Push a written row to Pathway so it is indexed without waiting for a poll."""
+    try:
+        await get_http_client().post(PATHWAY_INGEST_URL, json={"row": inc}, timeout=2)
+    except Exception as e:
+        logger.warning(f"Pathway ingest notify failed (poller will catch up): {e}")
+
+
+async def wait_for_consistency(token: str) -> bool:
+    """Wait until Pathway reports the write behind `token` as queryable."""
+    try:
+        resp = await get_http_client().get(
+            PATHWAY_INGEST_WAIT_URL,
+            params={"token": token, "timeout": CONSISTENCY_WAIT_TIMEOUT},
+            timeout=CONSISTENCY_WAIT_TIMEOUT + 2
+        )
+        return bool(resp.json().get("absorbed"))
+    except Exception as e:
+        logger.warning(f"Consistency wait failed for {token}: {e}")
+        return False
+
+
 # ============================================================
 # WebSocket Connection Manager
 # ============================================================
@@ -191,6 +311,164 @@ class ConnectionManager:
 manager = ConnectionManager()
 
 
+# ============================================================
+# Incident Change Log (delta sync)
+# ============================================================
+
+class IncidentChangeLog:
+    """
+    Bounded log of incident upserts and deletions, numbered by a version that
+    increases by one per change. Fed by this server's write handlers and by
+    diffing the Pathway snapshot; clients older than the log must resync.
+    Clients see the version as the token "<epoch>:<n>"; the epoch changes on
+    every server start, so a token from before a restart always resyncs.
+    """
+
+    def __init__(self, size: int):
+        self.entries: deque = deque(maxlen=size)  # (version, incident_id, row or None)
+        self.epoch = f"{time.time_ns():x}"
+        self.version = 0
+        self.seeded = False
+        # incident_id -> (updated_at recorded, monotonic time recorded, deleted)
+        self.recorded: Dict[str, Tuple[str, float, bool]] = {}
+
+    @property
+    def token(self) -> str:
+        return f"{self.epoch}:{self.version}"
+
+    def _append(self, inc_id: str, row: Optional[dict]):
+        self.version += 1
+        self.entries.append((self.version, inc_id, row))
+
+    def record(self, row: dict, fetched_at: Optional[float] = None) -> bool:
+        """
+        Record an upserted or soft-deleted row; ignores versions already seen,
+        except a live row for an id the log holds a tombstone for (e.g. after
+        a short snapshot), which is re-emitted. A snapshot row (fetched at
+        monotonic time fetched_at) only revives tombstones older than the fetch.
+        """
+        inc_id = row.get("incident_id", row.get("id"))
+        updated_at = str(row.get("updated_at") or "")
+        previous = self.recorded.get(inc_id)
+        deleted = bool(row.get("deleted_at"))
+        revived = (
+            previous is not None and previous[2] and not deleted
+            and (fetched_at is None or previous[1] < fetched_at)
+        )
+        if not inc_id or (previous and previous[0] >= updated_at and not revived):
+            return False
+        if deleted and (previous is None or previous[2]):
+            return False
+        self._append(inc_id, None if deleted else row)
+        self.recorded[inc_id] = (updated_at, time.monotonic(), deleted)
+        return True
+
+    def sync(self, incidents: List[dict], fetched_at: float, complete: bool = True) -> int:
+        """
+        Diff a full snapshot (fetched at monotonic time fetched_at) against the
+        log and record what changed. Rows written locally after the fetch
+        started are left alone, so a stale snapshot cannot undo them. Absent
+        rows are only taken as deleted if the snapshot is `complete` (Pathway
+        has read its source) and not empty.
+        """
+        if not self.seeded:
+            self.seeded = True
+            for row in incidents:
+                inc_id = row.get("incident_id", row.get("id"))
+                if inc_id and inc_id not in self.recorded:
+                    self.recorded[inc_id] = (str(row.get("updated_at") or ""), 0.0, False)
+            return 0
+
+        changes = 0
+        present = set()
+        for row in incidents:
+            present.add(row.get("incident_id", row.get("id")))
+            changes += self.record(row, fetched_at)
+        if not complete or not incidents:
+            return changes
+        for inc_id, (updated_at, recorded_at, deleted) in list(self.recorded.items()):
+            if inc_id not in present and not deleted and recorded_at < fetched_at:
+                self.recorded[inc_id] = (updated_at, time.monotonic(), True)
+                self._append(inc_id, None)
+                changes += 1
+        return changes
+
+    def since(self, token: str) -> Optional[dict]:
+        """Changes after version token `token`, or None if the log no longer covers it."""
+        epoch, _, number = token.partition(":")
+        if epoch != self.epoch or not number.isdigit():
+            return None  # Token from before a server restart (or malformed)
+        version = int(number)
+        if version > self.version:
+            return None
+        if version < self.version and (not self.entries or self.entries[0][0] > version + 1):
+            return None  # Log rolled over
+        start = len(self.entries) - (self.version - version)
+        latest: Dict[str, Optional[dict]] = {}
+        for _, inc_id, row in islice(self.entries, start, None):
+            latest[inc_id] = row
+        return {
+            "version": self.token,
+            "upserts": [transform_incident(row) for row in latest.values() if row is not None],
+            "deletes": [inc_id for inc_id, row in latest.items() if row is None],
+        }
+
+
+change_log = IncidentChangeLog(CHANGE_LOG_SIZE)
+
+
+async def fetch_pathway_snapshot(etag: Optional[str] = None) -> Tuple[Optional[str], Optional[List[dict]], bool]:
+    """
+    Conditional GET of the Pathway incidents snapshot; rows are None if `etag`
+    is current. The flag is False while Pathway has not yet read its source.
+    """
+    headers = {"If-None-Match": etag} if etag else {}
+    response = await get_http_client().get(PATHWAY_INCIDENTS_URL, headers=headers, timeout=10)
+    if response.status_code == 304:
+        return etag, None, True
+    response.raise_for_status()
+    synced = response.headers.get("X-Incidents-Synced", "true") != "false"
+    return response.headers.get("ETag"), response.json(), synced
+
+
+async def incident_sync_loop():
+    """
+    Refresh the in-process incident cache and the change log from the Pathway
+    snapshot, and tell clients when it moves. Falls back to Supabase (at the
+    cache's slower refresh rate) while Pathway is down.
+    """
+    etag = None
+    while True:
+        try:
+            fetched_at = time.monotonic()
+            etag, incidents, synced = await fetch_pathway_snapshot(etag)
+            if incidents is not None:
+                incident_index.load(incidents, etag.strip('"') if etag else None, fetched_at)
+                if change_log.sync(incidents, fetched_at, complete=synced):
+                    await manager.broadcast({"type": "incidents_changed", "version": change_log.token})
+        except httpx.ConnectError:
+            etag = None
+            await incident_index.ensure_fresh()
+        except Exception as e:
+            logger.debug(f"Incident sync skipped: {e}")
+        await asyncio.sleep(INCIDENT_SYNC_INTERVAL)
+
+
+incident_sync_task: Optional[asyncio.Task] = None
+
+
+@app.on_event("startup")
+async def start_incident_sync():
+    global incident_sync_task
+    incident_sync_task = asyncio.create_task(incident_sync_loop())
+
+
+@app.on_event("shutdown")
+async def stop_incident_sync():
+    if incident_sync_task is not None:
+        incident_sync_task.cancel()
+
+
 # ============================================================
 # Root & Health Endpoints
 # ============================================================
@@ -202,8 +480,10 @@ async def root():
         "architecture": "UI → FastAPI (CRUD) → Supabase | UI → FastAPI → Pathway (RAG)",
         "endpoints": {
             "crud": "/api/incidents",
+            "changes": "/api/incidents/changes?since=<version>",
             "search": "/api/incidents/search",
             "chat": "/api/chat",
+            "chatStream": "/api/chat/stream",
             "websocket": "/ws/incidents"
         }
     }
@@ -215,21 +495,23 @@ async def health_check():
     pathway_status = "unknown"
     supabase_status = "unknown"
     
+    client = get_http_client()
+    
     # Check Pathway
     try:
-        resp = requests.get("http://localhost:8081/", timeout=2)
-        pathway_status = "running" if resp.ok else "error"
+        resp = await client.get("http://localhost:8081/", timeout=2)
+        pathway_status = "running" if resp.is_success else "error"
     except:
         pathway_status = "unreachable"
     
     # Check Supabase
     try:
-        resp = requests.get(
+        resp = await client.get(
             f"{SUPABASE_URL}/rest/v1/",
             headers={"apikey": SUPABASE_KEY},
             timeout=2
         )
-        supabase_status = "connected" if resp.ok else "error"
+        supabase_status = "connected" if resp.is_success else "error"
     except:
         supabase_status = "unreachable"
     
@@ -245,29 +527,163 @@ async def health_check():
 # PRIORITY 1: CRUD Operations
 # ============================================================
 
-@app.get("/api/incidents")
-async def get_incidents():
+# Frontend field name -> incidents column, for fields= projection pushdown
+INCIDENT_FIELD_COLUMNS = {
+    "id": "incident_id",
+    "title": "title",
+    "description": "description",
+    "severity": "severity",
+    "status": "status",
+    "location": "location",
+    "createdAt": "created_at",
+    "updatedAt": "updated_at",
+}
+
+
+def encode_cursor(created_at: str, incident_id: str) -> str:
+    """Opaque keyset cursor; same encoding as the Pathway incidents API."""
+    return base64.urlsafe_b64encode(f"{created_at}|{incident_id}".encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    try:
+        created_at, _, incident_id = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8").partition("|")
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return created_at, incident_id
+
+
+def _postgrest_value(value: str) -> str:
+    """Double-quote a value inside a PostgREST in/or/and expression."""
+    return '"' + value.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def _ilike_literal(value: str) -> str:
     """
-    Get all active incidents.
-    Fetches from Pathway cache for consistency with RAG.
+    ILIKE pattern matching `value` exactly (case-insensitively), like the
+    Pathway path's lowercase equality. PostgREST turns every "*" into "%",
+    so a literal "*" cannot be expressed and becomes the one-character wildcard.
     """
+    escaped = value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return escaped.replace("*", "_")
+
+
+def supabase_page_params(query: dict, columns: List[str], limit: int) -> dict:
+    """Translate a page query into PostgREST filters, keyset condition and projection."""
+    params = {
+        "deleted_at": "is.null",
+        "order": "created_at.desc,incident_id.desc",
+        "limit": str(limit + 1),  # One extra row tells us whether there is a next page
+    }
+    if columns:
+        params["select"] = ",".join(columns)
+    for field in ("severity", "status"):
+        if query.get(field):
+            values = [v.strip().lower() for v in query[field].split(",") if v.strip()]
+            params[field] = f"in.({','.join(_postgrest_value(v) for v in values)})"
+    if query.get("location"):
+        params["location"] = f"ilike.{_ilike_literal(query['location'])}"
+    conditions = []
+    if query.get("since"):
+        conditions.append(f"created_at.gte.{_postgrest_value(query['since'])}")
+    if query.get("until"):
+        conditions.append(f"created_at.lt.{_postgrest_value(query['until'])}")
+    if query.get("cursor"):
+        created_at, incident_id = (_postgrest_value(v) for v in decode_cursor(query["cursor"]))
+        conditions.append(
+            f"or(created_at.lt.{created_at},and(created_at.eq.{created_at},incident_id.lt.{incident_id}))"
+        )
+    if conditions:
+        params["and"] = f"({','.join(conditions)})"
+    return params
+
+
+async def query_incident_page(query: dict, columns: List[str], limit: int) -> Tuple[List[dict], str]:
+    """
+    One filtered page of raw incident rows and the next cursor ("" if last).
+    Pushed down to the Pathway cache, or to Supabase if Pathway is down.
+    """
+    pathway_params = {**query, "limit": str(limit)}
+    if columns:
+        pathway_params["fields"] = ",".join(columns)
     try:
-        response = requests.get(PATHWAY_INCIDENTS_URL, timeout=10)
+        response = await get_http_client().get(PATHWAY_INCIDENTS_URL, params=pathway_params, timeout=10)
         response.raise_for_status()
-        incidents = response.json()
-        return [transform_incident(inc) for inc in incidents]
-    except requests.exceptions.ConnectionError:
-        # Pathway not running - fall back to direct Supabase query
+        return response.json(), response.headers.get("X-Next-Cursor", "")
+    except httpx.ConnectError:
+        rows = await supabase_request("GET", "incidents", params=supabase_page_params(query, columns, limit)) or []
+        if len(rows) <= limit:
+            return rows, ""
+        last = rows[limit - 1]
+        return rows[:limit], encode_cursor(str(last.get("created_at", "")), str(last.get("incident_id", "")))
+
+
+@app.get("/api/incidents")
+async def get_incidents(
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=INCIDENT_PAGE_MAX),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    severity: Optional[str] = None,
+    status: Optional[str] = None,
+    location: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+):
+    """
+    Get all active incidents.
+    Served from the in-process incident cache, which mirrors the Pathway
+    snapshot (for consistency with RAG) plus this server's own writes.
+    X-Changes-Version is the change-log version token to pass to /api/incidents/changes.
+
+    With any of limit/cursor/fields/severity/status/location/since/until,
+    returns one page ordered by (created_at, incident_id) descending instead;
+    severity and status take comma-separated values, since/until are ISO
+    timestamps on created_at, and X-Next-Cursor holds the cursor for the next
+    page (empty on the last one).
+    """
+    query = {
+        key: value for key, value in {
+            "cursor": cursor, "severity": severity, "status": status,
+            "location": location, "since": since, "until": until,
+        }.items() if value
+    }
+    if query or limit or fields:
+        projection = [f.strip() for f in (fields or "").split(",") if f.strip()]
+        unknown = [f for f in projection if f not in INCIDENT_FIELD_COLUMNS]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+        # The cursor needs the keyset columns even when they are not projected
+        columns = sorted({INCIDENT_FIELD_COLUMNS[f] for f in projection} | {"incident_id", "created_at"}) if projection else []
         try:
-            result = supabase_request(
-                "GET", "incidents",
-                params={"deleted_at": "is.null", "order": "created_at.desc"}
-            )
-            return [transform_incident(inc) for inc in result]
-        except:
-            return []
-    except Exception:
-        return []
+            rows, next_cursor = await query_incident_page(query, columns, limit or INCIDENT_PAGE_MAX)
+        except httpx.HTTPStatusError as e:
+            raise HTTPException(status_code=e.response.status_code, detail=e.response.text)
+        response.headers["X-Next-Cursor"] = next_cursor
+        incidents = [transform_incident(row) for row in rows]
+        if projection:
+            incidents = [{f: inc[f] for f in projection} for inc in incidents]
+        return incidents
+
+    # Read before the cache: replaying changes the list already has is harmless
+    response.headers["X-Changes-Version"] = change_log.token
+    if not incident_index.loaded_at:
+        await incident_index.ensure_fresh()
+    return incident_index.listing()
+
+
+@app.get("/api/incidents/changes")
+async def get_incident_changes(since: str = Query(..., min_length=1)):
+    """
+    Incidents upserted or deleted after change-log version token `since`.
+    Returns {"resync": true} when the log no longer reaches back that far or
+    the token is from before a server restart; the client should then reload
+    /api/incidents.
+    """
+    changes = change_log.since(since)
+    if changes is None:
+        return {"resync": True, "version": change_log.token, "upserts": [], "deletes": []}
+    return {"resync": False, **changes}
 
 
 @app.get("/api/live-updates")
@@ -278,7 +694,7 @@ async def get_live_updates():
     """
     try:
         # Fetch incidents ordered by updated_at descending
-        result = supabase_request(
+        result = await supabase_request(
             "GET", "incidents",
             params={
                 "deleted_at": "is.null",
@@ -318,7 +734,8 @@ async def get_live_updates():
 async def create_incident(request: CreateIncidentRequest):
     """
     Create a new incident in Supabase.
-    Pathway will pick it up on next polling cycle.
+    Pathway is notified immediately; the returned consistencyToken can be
+    passed to /api/chat to wait until the AI can see it.
     """
     # Generate incident ID: INC-YYYYMMDD-HHMMSS
     timestamp = datetime.now()
@@ -338,17 +755,21 @@ async def create_incident(request: CreateIncidentRequest):
         "updated_at": timestamp.isoformat()
     }
     
-    result = supabase_request("POST", "incidents", data=data)
+    result = await supabase_request("POST", "incidents", data=data)
     incident = result[0] if isinstance(result, list) else result
+    await notify_pathway(incident)
+    change_log.record(incident)
+    incident_index.upsert(incident)
     
     # Broadcast to WebSocket clients
     await manager.broadcast({
         "type": "incident_created",
         "incident_id": incident_id,
+        "version": change_log.token,
         "timestamp": timestamp.isoformat()
     })
     
-    return transform_incident(incident)
+    return {**transform_incident(incident), "consistencyToken": consistency_token(incident)}
 
 
 @app.patch("/api/incidents/{incident_id}", response_model=IncidentResponse)
@@ -378,7 +799,7 @@ async def update_incident(incident_id: str, request: UpdateIncidentRequest):
     data["updated_at"] = datetime.now().isoformat()
     
     # Update in Supabase
-    result = supabase_request(
+    result = await supabase_request(
         "PATCH", f"incidents?incident_id=eq.{incident_id}",
         data=data
     )
@@ -387,16 +808,20 @@ async def update_incident(incident_id: str, request: UpdateIncidentRequest):
         raise HTTPException(status_code=404, detail="Incident not found")
     
     incident = result[0] if isinstance(result, list) else result
+    await notify_pathway(incident)
+    change_log.record(incident)
+    incident_index.upsert(incident)
     
     # Broadcast to WebSocket clients
     await manager.broadcast({
         "type": "incident_updated",
         "incident_id": incident_id,
         "changes": list(data.keys()),
+        "version": change_log.token,
         "timestamp": datetime.now().isoformat()
     })
     
-    return transform_incident(incident)
+    return {**transform_incident(incident), "consistencyToken": consistency_token(incident)}
 
 
 @app.post("/api/incidents/{incident_id}/soft-delete")
@@ -409,7 +834,7 @@ async def soft_delete_incident(incident_id: str):
         "updated_at": datetime.now().isoformat()
     }
     
-    result = supabase_request(
+    result = await supabase_request(
         "PATCH", f"incidents?incident_id=eq.{incident_id}",
         data=data
     )
@@ -417,14 +842,24 @@ async def soft_delete_incident(incident_id: str):
     if not result:
         raise HTTPException(status_code=404, detail="Incident not found")
     
+    incident = result[0] if isinstance(result, list) else result
+    await notify_pathway(incident)
+    change_log.record(incident)
+    incident_index.remove(incident_id)
+    
     # Broadcast to WebSocket clients
     await manager.broadcast({
         "type": "incident_deleted",
         "incident_id": incident_id,
+        "version": change_log.token,
         "timestamp": datetime.now().isoformat()
     })
     
-    return {"success": True, "incident_id": incident_id}
+    return {
+        "success": True,
+        "incident_id": incident_id,
+        "consistencyToken": consistency_token(incident)
+    }
 
 
 # Keep backward compatibility with existing UI DELETE method
@@ -441,15 +876,25 @@ async def delete_incident(incident_id: str):
 @app.get("/api/incidents/search")
 async def search_incidents(q: str = Query(..., min_length=1)):
     """
-    Search incidents using Supabase full-text search on search_vector.
+    Keyword search over the in-process incident cache: BM25 ranking with
+    prefix matching and boosts on ID, title and location.
+    Falls back to Supabase ILIKE until the cache has loaded.
     """
     if not q.strip():
         return []
     
+    if not incident_index.loaded_at:
+        await incident_index.ensure_fresh()
+    if incident_index.loaded_at:
+        return [
+            transform_incident(incident_index.by_id[inc_id])
+            for inc_id, _ in incident_index.keywords.search(q, limit=50)
+        ]
+    
     # Use Supabase text search
     # Format: column=fts.query (full-text search)
     try:
-        result = supabase_request(
+        result = await supabase_request(
             "GET", "incidents",
             params={
                 "deleted_at": "is.null",
@@ -462,7 +907,7 @@ async def search_incidents(q: str = Query(..., min_length=1)):
     except Exception as e:
         # Fallback: simple ILIKE search if full-text fails
         try:
-            result = supabase_request(
+            result = await supabase_request(
                 "GET", "incidents",
                 params={
                     "deleted_at": "is.null",
@@ -475,6 +920,26 @@ async def search_incidents(q: str = Query(..., min_length=1)):
             return []
 
 
+# Declared after /search and /changes so those paths are not taken as IDs
+@app.get("/api/incidents/{incident_id}", response_model=IncidentResponse)
+async def get_incident(incident_id: str):
+    """
+    Get one incident from the in-process cache.
+    Cache misses (e.g. written by another client since the last refresh)
+    are looked up in Supabase.
+    """
+    incident = incident_index.by_id.get(incident_id)
+    if incident is None:
+        result = await supabase_request(
+            "GET", "incidents",
+            params={"incident_id": f"eq.{incident_id}", "deleted_at": "is.null", "limit": "1"}
+        )
+        if not result:
+            raise HTTPException(status_code=404, detail="Incident not found")
+        incident = result[0]
+    return transform_incident(incident)
+
+
 # RAG Chat Endpoint (Pathway Proxy)
 # ============================================================
 
@@ -623,33 +1088,909 @@ def detect_query_mode(user_query: str) -> str:
     return "reasoning"
 
 
-@app.post("/api/chat", response_model=ChatResponse)
-async def chat(request: ChatRequest):
-    """Chat with Pathway RAG."""
-    
-    # Check for greeting
-    greeting_response = detect_greeting_intent(request.message)
-    if greeting_response:
-        return ChatResponse(
-            response=greeting_response,
-            timestamp=datetime.now().isoformat()
+# ============================================================
+# Structured Query Fast Path (no LLM)
+# ============================================================
+
+SEVERITY_LEVELS = ["critical", "high", "medium", "low"]
+STATUS_VALUES = ["open", "investigating", "resolved", "closed"]
+STATUS_ALIASES = {
+    "active": ["open", "investigating"],
+    "unresolved": ["open", "investigating"],
+    "ongoing": ["investigating"],
+    "fixed": ["resolved", "closed"],
+}
+
+# Words that carry no filter meaning in search-mode queries
+FILTER_STOPWORDS = {
+    "list", "show", "get", "find", "what", "are", "which", "all", "me", "the",
+    "incident", "incidents", "issue", "issues", "in", "at", "from", "with",
+    "of", "is", "there", "any", "currently", "current", "now", "please",
+    "severity", "status", "location", "level", "risk", "priority", "and", "or",
+    "a", "an", "that", "have", "has", "been", "were", "was", "my", "our",
+}
+
+# Words that make a query span or contrast filter values ("compare A and B",
+# "more in A than B"); such queries get no retrieval pre-filter
+COMPARISON_WORDS = {
+    "compare", "compared", "comparing", "comparison", "versus", "vs", "than",
+    "between", "difference", "differences", "other",
+}
+
+# Words that negate the filter term following them (within NEGATION_WINDOW words)
+NEGATION_WORDS = {
+    "not", "non", "no", "except", "excluding", "exclude", "without", "outside",
+    "isn't", "aren't", "wasn't", "weren't", "never", "besides",
+}
+NEGATION_WINDOW = 3
+
+TIME_WINDOWS = [
+    (re.compile(r'\b(?:in\s+the\s+)?(?:last|past)\s+(\d+)\s+hours?\b'), lambda n: n * 3600),
+    (re.compile(r'\b(?:in\s+the\s+)?(?:last|past)\s+(\d+)\s+days?\b'), lambda n: n * 86400),
+    (re.compile(r'\b(?:in\s+the\s+)?(?:last|past)\s+hour\b'), lambda n: 3600),
+    (re.compile(r'\b(?:this|last|past)\s+week\b'), lambda n: 7 * 86400),
+    (re.compile(r'\btoday\b'), None),
+    (re.compile(r'\byesterday\b'), None),
+]
+
+
+def parse_timestamp(value: Optional[str]) -> Optional[datetime]:
+    """Parse an ISO timestamp from Supabase into an aware datetime."""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(str(value).replace("Z", "+00:00")).astimezone()
+    except ValueError:
+        return None
+
+
+def is_negated(prefix: str) -> bool:
+    """True if the words just before a filter term negate it ("not", "non-", "except", ...)."""
+    words = re.findall(r"[a-z0-9']+", prefix)[-NEGATION_WINDOW:]
+    return any(w in NEGATION_WORDS for w in words) or "other than" in " ".join(words)
+
+
+def extract_filters(query: str, known_locations: List[str]) -> Tuple[dict, List[str]]:
+    """
+    Pull severity/status/location/time filters out of a query.
+    Returns the filters and the words that were not understood.
+    Negated terms ("not resolved", "non-critical", "except Block A") are not
+    turned into filters; they stay in the residual so callers cannot treat
+    the query as fully understood.
+    """
+    text = query.lower()
+    filters: dict = {}
+    residual = []
+
+    # Time window
+    now = datetime.now().astimezone()
+    for pattern, seconds in TIME_WINDOWS:
+        match = pattern.search(text)
+        if not match:
+            continue
+        if is_negated(text[:match.start()]):
+            residual.append(match.group(0))
+            break
+        if match.group(0) == "today":
+            filters["since"] = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        elif match.group(0) == "yesterday":
+            midnight = now.replace(hour=0, minute=0, second=0, microsecond=0)
+            filters["since"] = midnight - timedelta(days=1)
+            filters["until"] = midnight
+        else:
+            n = int(match.group(1)) if match.groups() else 1
+            filters["since"] = now - timedelta(seconds=seconds(n))
+        text = text[:match.start()] + " " + text[match.end():]
+        break
+
+    # Locations (every known value mentioned, longest first so "block a1" wins over "block a")
+    for location in sorted(known_locations, key=len, reverse=True):
+        match = re.search(rf'\b{re.escape(location)}\b', text)
+        if match:
+            if is_negated(text[:match.start()]):
+                residual.append(location)
+            else:
+                filters.setdefault("location", set()).add(location)
+            text = text[:match.start()] + " " + text[match.end():]
+
+    for match in re.finditer(r"[a-z0-9']+", text):
+        word = match.group(0)
+        is_filter_word = word in SEVERITY_LEVELS or word in STATUS_VALUES or word in STATUS_ALIASES
+        if is_filter_word and is_negated(text[:match.start()]):
+            residual.append(word)
+        elif word in SEVERITY_LEVELS:
+            filters.setdefault("severity", set()).add(word)
+        elif word in STATUS_VALUES:
+            filters.setdefault("status", set()).add(word)
+        elif word in STATUS_ALIASES:
+            filters.setdefault("status", set()).update(STATUS_ALIASES[word])
+        elif word not in FILTER_STOPWORDS:
+            residual.append(word)
+    return filters, residual
+
+
+def parse_search_filters(query: str, known_locations: List[str]) -> Optional[dict]:
+    """
+    Parse a search-mode query into exact severity/status/location/time filters.
+    Returns None if any part of the query is not understood, so the caller
+    escalates to Pathway instead of returning a partial answer.
+    """
+    filters, residual = extract_filters(query, known_locations)
+    if residual:
+        return None
+    if not filters and "incident" not in query.lower():
+        return None
+    return filters
+
+
+class KeywordIndex:
+    """
+    In-memory inverted index for keyword search, scored with BM25F: term
+    frequencies are combined across fields with per-field boosts and length
+    normalization. The last query term also matches indexed terms it is a
+    prefix of (search-as-you-type), at a discount. Maintained incrementally
+    by IncidentIndex.
+    """
+
+    FIELD_BOOSTS = {"incident_id": 5.0, "title": 3.0, "location": 2.0, "description": 1.0}
+    K1 = 1.2
+    B = 0.75
+    PREFIX_WEIGHT = 0.5
+    MAX_PREFIX_TERMS = 50
+    # Terms in more than this share of documents scan most postings: when the
+    # query has rarer terms, they are only scored for the rare terms' matches,
+    # plus a full scan if a document matching only them could still rank
+    COMMON_TERM_RATIO = 0.5
+    TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+    def __init__(self):
+        self.postings: Dict[str, Dict[str, Dict[str, int]]] = {}  # term -> id -> field -> tf
+        self.terms: List[str] = []  # Sorted vocabulary for prefix lookups
+        self.doc_terms: Dict[str, set] = {}
+        self.field_lengths: Dict[str, Dict[str, int]] = {}
+        self.total_lengths = {field: 0 for field in self.FIELD_BOOSTS}
+
+    @classmethod
+    def tokenize(cls, text: str) -> List[str]:
+        return cls.TOKEN_PATTERN.findall(str(text or "").lower())
+
+    def add(self, inc_id: str, inc: dict):
+        self.remove(inc_id)
+        lengths, terms = {}, set()
+        for field in self.FIELD_BOOSTS:
+            tokens = self.tokenize(inc.get(field))
+            lengths[field] = len(tokens)
+            self.total_lengths[field] += len(tokens)
+            for token in tokens:
+                postings = self.postings.get(token)
+                if postings is None:
+                    postings = self.postings[token] = {}
+                    bisect.insort(self.terms, token)
+                fields = postings.setdefault(inc_id, {})
+                fields[field] = fields.get(field, 0) + 1
+                terms.add(token)
+        self.field_lengths[inc_id] = lengths
+        self.doc_terms[inc_id] = terms
+
+    def remove(self, inc_id: str):
+        lengths = self.field_lengths.pop(inc_id, None)
+        if lengths is None:
+            return
+        for field, length in lengths.items():
+            self.total_lengths[field] -= length
+        for token in self.doc_terms.pop(inc_id, ()):
+            postings = self.postings[token]
+            postings.pop(inc_id, None)
+            if not postings:
+                del self.postings[token]
+                del self.terms[bisect.bisect_left(self.terms, token)]
+
+    def _expand(self, token: str, prefix: bool) -> List[Tuple[str, float]]:
+        """The token itself plus (if prefix) indexed terms it is a prefix of."""
+        expansions = [(token, 1.0)] if token in self.postings else []
+        if not prefix:
+            return expansions
+        start = bisect.bisect_left(self.terms, token)
+        for term in islice(self.terms, start, start + self.MAX_PREFIX_TERMS):
+            if not term.startswith(token):
+                break
+            if term != token:
+                expansions.append((term, self.PREFIX_WEIGHT))
+        return expansions
+
+    def search(self, query: str, limit: int = 50) -> List[Tuple[str, float]]:
+        """(incident_id, score) pairs, best first."""
+        n = len(self.field_lengths)
+        if not n:
+            return []
+        avg_lengths = {f: max(total / n, 1.0) for f, total in self.total_lengths.items()}
+        tokens = list(dict.fromkeys(self.tokenize(query)))
+        expanded = [
+            (term, weight)
+            for i, token in enumerate(tokens)
+            for term, weight in self._expand(token, prefix=i == len(tokens) - 1)
+        ]
+        rare = [(t, w) for t, w in expanded if len(self.postings[t]) <= n * self.COMMON_TERM_RATIO]
+        common = [(t, w) for t, w in expanded if len(self.postings[t]) > n * self.COMMON_TERM_RATIO]
+        if not rare:
+            rare, common = common, []
+        idfs = {
+            term: math.log(1 + (n - len(self.postings[term]) + 0.5) / (len(self.postings[term]) + 0.5))
+            for term, _ in expanded
+        }
+
+        def term_score(inc_id: str, fields: Dict[str, int], term: str, weight: float) -> float:
+            lengths = self.field_lengths[inc_id]
+            tf = sum(
+                self.FIELD_BOOSTS[f] * count
+                / (1 - self.B + self.B * lengths[f] / avg_lengths[f])
+                for f, count in fields.items()
+            )
+            return weight * idfs[term] * tf * (self.K1 + 1) / (tf + self.K1)
+
+        scores: Dict[str, float] = {}
+        for term, weight in rare:
+            for inc_id, fields in self.postings[term].items():
+                scores[inc_id] = scores.get(inc_id, 0.0) + term_score(inc_id, fields, term, weight)
+        candidates = list(scores)
+        for term, weight in common:
+            postings = self.postings[term]
+            for inc_id in candidates:
+                fields = postings.get(inc_id)
+                if fields:
+                    scores[inc_id] += term_score(inc_id, fields, term, weight)
+
+        # A document matching only common terms scores below this bound
+        # (tf saturates at K1 + 1); scan for them only if they could rank
+        bound = sum(weight * idfs[term] * (self.K1 + 1) for term, weight in common)
+        top = heapq.nlargest(limit, scores.values())
+        if common and (len(top) < limit or top[-1] < bound):
+            others: Dict[str, float] = {}
+            for term, weight in common:
+                for inc_id, fields in self.postings[term].items():
+                    if inc_id not in scores:
+                        others[inc_id] = others.get(inc_id, 0.0) + term_score(inc_id, fields, term, weight)
+            scores.update(others)
+        return heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+
+
+class IncidentIndex:
+    """
+    In-process incident cache keyed by incident_id, with secondary indexes
+    on severity, status and location. Written through by this server's
+    create/update/delete handlers and reloaded from the Pathway snapshot
+    (or Supabase) in the background whenever the published version changes.
+    """
+
+    def __init__(self):
+        self.by_id: Dict[str, dict] = {}
+        self.by_severity: Dict[str, set] = {}
+        self.by_status: Dict[str, set] = {}
+        self.by_location: Dict[str, set] = {}
+        self.version: Optional[str] = None
+        self.loaded_at = 0.0
+        self.seq = 0  # Bumped on every load and write-through
+        self._listing: Optional[List[dict]] = None
+        # Local writes: incident_id -> (row or None if deleted, monotonic time)
+        self._writes: Dict[str, Tuple[Optional[dict], float]] = {}
+        self.keywords = KeywordIndex()
+        self._lock = asyncio.Lock()
+
+    def _index(self, inc_id: str, inc: dict):
+        self.by_id[inc_id] = inc
+        self.keywords.add(inc_id, inc)
+        self.by_severity.setdefault(str(inc.get("severity", "")).lower(), set()).add(inc_id)
+        self.by_status.setdefault(str(inc.get("status", "")).lower(), set()).add(inc_id)
+        self.by_location.setdefault(str(inc.get("location", "")).lower(), set()).add(inc_id)
+
+    def _unindex(self, inc_id: str):
+        inc = self.by_id.pop(inc_id, None)
+        if inc is None:
+            return
+        self.keywords.remove(inc_id)
+        for index, field in ((self.by_severity, "severity"), (self.by_status, "status"),
+                             (self.by_location, "location")):
+            key = str(inc.get(field, "")).lower()
+            ids = index.get(key)
+            if ids is not None:
+                ids.discard(inc_id)
+                if not ids:
+                    del index[key]
+
+    def _changed(self):
+        self.seq += 1
+        self._listing = None
+
+    def load(self, incidents: List[dict], version: Optional[str], fetched_at: Optional[float] = None):
+        """
+        Bring the cache in line with a snapshot fetched at monotonic time
+        fetched_at. Local writes made after the fetch started are re-applied on top.
+        """
+        # Incremental: only rows that changed (or disappeared) are re-indexed
+        current = {}
+        for inc in incidents:
+            inc_id = inc.get("incident_id", inc.get("id"))
+            if inc_id:
+                current[inc_id] = inc
+        for inc_id in [i for i in self.by_id if i not in current]:
+            self._unindex(inc_id)
+        for inc_id, inc in current.items():
+            if self.by_id.get(inc_id) != inc:
+                self._unindex(inc_id)
+                self._index(inc_id, inc)
+        fetched_at = time.monotonic() if fetched_at is None else fetched_at
+        for inc_id, (row, written_at) in list(self._writes.items()):
+            if written_at < fetched_at:
+                del self._writes[inc_id]
+            elif row is None:
+                self._unindex(inc_id)
+            else:
+                self._unindex(inc_id)
+                self._index(inc_id, row)
+        self.version = version
+        self.loaded_at = time.monotonic()
+        self._changed()
+
+    def upsert(self, inc: dict):
+        """Write-through of a row returned by Supabase."""
+        inc_id = inc.get("incident_id", inc.get("id"))
+        if not inc_id:
+            return
+        if inc.get("deleted_at"):
+            self.remove(inc_id)
+            return
+        self._unindex(inc_id)
+        self._index(inc_id, inc)
+        self._writes[inc_id] = (inc, time.monotonic())
+        self._changed()
+
+    def remove(self, inc_id: str):
+        self._unindex(inc_id)
+        self._writes[inc_id] = (None, time.monotonic())
+        self._changed()
+
+    def listing(self) -> List[dict]:
+        """All cached incidents in frontend format, newest first (built once per change)."""
+        if self._listing is None:
+            rows = sorted(
+                self.by_id.values(),
+                key=lambda inc: (str(inc.get("created_at", "")), str(inc.get("incident_id", ""))),
+                reverse=True,
+            )
+            self._listing = [transform_incident(inc) for inc in rows]
+        return self._listing
+
+    def is_stale(self, version: Optional[str]) -> bool:
+        if not self.loaded_at:
+            return True
+        if version:
+            return version != self.version
+        return time.monotonic() - self.loaded_at > INCIDENTS_VERSION_TTL * 5
+
+    async def ensure_fresh(self) -> bool:
+        """Reload if the incident-set version moved; returns False if no data."""
+        version = await get_incidents_version()
+        if self.is_stale(version):
+            async with self._lock:
+                # Re-check: another request may have reloaded while we waited
+                if self.is_stale(version):
+                    try:
+                        fetched_at = time.monotonic()
+                        incidents = await fetch_incident_snapshot()
+                        self.load(incidents, version, fetched_at)
+                    except Exception as e:
+                        logger.warning(f"Incident index refresh failed: {e}")
+        return bool(self.by_id)
+
+    def query(self, filters: dict) -> List[dict]:
+        ids = set(self.by_id)
+        if "severity" in filters:
+            ids &= set().union(*(self.by_severity.get(s, set()) for s in filters["severity"]))
+        if "status" in filters:
+            ids &= set().union(*(self.by_status.get(s, set()) for s in filters["status"]))
+        if "location" in filters:
+            ids &= set().union(*(self.by_location.get(l, set()) for l in filters["location"]))
+        results = [self.by_id[i] for i in ids]
+        if "since" in filters or "until" in filters:
+            since, until = filters.get("since"), filters.get("until")
+            kept = []
+            for inc in results:
+                ts = parse_timestamp(inc.get("created_at") or inc.get("timestamp"))
+                if ts is None or (since and ts < since) or (until and ts >= until):
+                    continue
+                kept.append(inc)
+            results = kept
+        results.sort(key=lambda inc: str(inc.get("created_at", "")), reverse=True)
+        return results
+
+
+incident_index = IncidentIndex()
+
+
+async def fetch_incident_snapshot() -> List[dict]:
+    """Raw active incidents from the Pathway cache, falling back to Supabase."""
+    try:
+        response = await get_http_client().get(PATHWAY_INCIDENTS_URL, timeout=10)
+        response.raise_for_status()
+        return response.json()
+    except httpx.ConnectError:
+        return await supabase_request(
+            "GET", "incidents",
+            params={"deleted_at": "is.null", "order": "created_at.desc"}
+        ) or []
+
+
+def describe_filters(filters: dict) -> str:
+    parts = []
+    if "severity" in filters:
+        parts.append("severity " + "/".join(sorted(filters["severity"])))
+    if "status" in filters:
+        parts.append("status " + "/".join(sorted(filters["status"])))
+    if "location" in filters:
+        parts.append("location " + "/".join(f"'{l}'" for l in sorted(filters["location"])))
+    if "since" in filters:
+        parts.append(f"created since {filters['since'].strftime('%Y-%m-%d %H:%M')}")
+    if "until" in filters:
+        parts.append(f"before {filters['until'].strftime('%Y-%m-%d %H:%M')}")
+    return ", ".join(parts) if parts else "no filters"
+
+
+def _jmespath_str(value: str) -> str:
+    return "'" + value.replace("\\", "\\\\").replace("'", "\\'") + "'"
+
+
+def retrieval_filter(filters: dict) -> Optional[str]:
+    """
+    Translate query filters into a JMESPath expression over document metadata
+    for Pathway's retriever. Each clause also matches documents without that
+    field, so sources that carry no incident metadata are never filtered out.
+    """
+    clauses = []
+    for field in ("severity", "status", "location"):
+        values = sorted(filters.get(field) or [])
+        if values:
+            options = " || ".join(f"{field} == {_jmespath_str(v)}" for v in values)
+            clauses.append(f"({field} == null || {options})")
+    # Bounds are floored to the minute so the expression (part of the answer
+    # cache and coalescing keys) stays stable for rolling windows
+    if "since" in filters:
+        since = int(filters["since"].timestamp()) // 60 * 60
+        clauses.append(f"(incident_created_at == null || incident_created_at >= `{since}`)")
+    if "until" in filters:
+        until = int(filters["until"].timestamp()) // 60 * 60
+        clauses.append(f"(incident_created_at == null || incident_created_at < `{until}`)")
+    return " && ".join(clauses) or None
+
+
+async def retrieval_filter_for(message: str) -> Optional[str]:
+    """
+    Metadata pre-filter for a RAG query, using the same vocabulary as the fast
+    path. Comparisons and negations ("Block A vs Block B", "excluding
+    resolved") need documents outside the mentioned values, so they get none.
+    """
+    await incident_index.ensure_fresh()
+    # The expansion can add severity/status terms but drops the rest, so parse both
+    enhanced = enhance_query(message)
+    text = message if enhanced == message else f"{message} {enhanced}"
+    filters, residual = extract_filters(text, list(incident_index.by_location))
+    if any(word in COMPARISON_WORDS or word in NEGATION_WORDS for word in residual):
+        return None
+    expression = retrieval_filter(filters)
+    if expression:
+        logger.info(f"🔎 Retrieval pre-filter: {describe_filters(filters)}")
+    return expression
+
+
+async def answer_structured_query(message: str) -> Optional[dict]:
+    """
+    Answer filter-style search queries straight from the incident index.
+    Returns None to escalate to Pathway (reasoning queries, unparsed terms,
+    or no index data).
+    """
+    if detect_query_mode(message) != "search":
+        return None
+    if not await incident_index.ensure_fresh():
+        return None
+    filters = parse_search_filters(message, list(incident_index.by_location))
+    if filters is None:
+        return None
+
+    matches = incident_index.query(filters)
+    if matches:
+        lines = [f"Found {len(matches)} incident(s) matching {describe_filters(filters)}:"]
+        for inc in matches:
+            inc_id = inc.get("incident_id", inc.get("id"))
+            lines.append(
+                f"• {inc_id} — {inc.get('title', 'Untitled')} "
+                f"(status: {inc.get('status')}, severity: {inc.get('severity')}, "
+                f"location: {inc.get('location')})"
+            )
+        response_text = "\n".join(lines)
+    else:
+        response_text = f"No incidents match {describe_filters(filters)}."
+
+    incident_refs = [inc.get("incident_id", inc.get("id")) for inc in matches]
+    return {
+        "response": response_text,
+        "mode": "search",
+        "dataSource": "Incident index",
+        "contextSize": len(matches),
+        "incidentRefs": incident_refs or None,
+    }
+
+
+class PathwayProxy:
+    """
+    Async client for the Pathway RAG server.
+    At most CHAT_MAX_INFLIGHT answers are in flight; up to CHAT_MAX_QUEUE
+    callers wait for a slot and anything beyond that is rejected with 503.
+    Uses its own connection pool so slow LLM calls never hold CRUD sockets.
+    """
+
+    def __init__(self, url: str, max_inflight: int, max_queue: int, timeout: float):
+        self.url = url
+        self.max_inflight = max_inflight
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self._semaphore = asyncio.Semaphore(max_inflight)
+        self._client: Optional[httpx.AsyncClient] = None
+        # Metrics
+        self.inflight = 0
+        self.queued = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(self.timeout, connect=5),
+                limits=httpx.Limits(
+                    max_connections=self.max_inflight,
+                    max_keepalive_connections=self.max_inflight,
+                ),
+            )
+        return self._client
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def saturated(self) -> bool:
+        return self.queued >= self.max_queue
+
+    def busy_error(self) -> HTTPException:
+        return HTTPException(
+            status_code=503,
+            detail="AI assistant is busy, please retry shortly",
+            headers={"Retry-After": str(CHAT_RETRY_AFTER)},
         )
-    
-    # Not a greeting - forward to Pathway RAG with enhanced prompt
+
+    async def _acquire(self):
+        if self.saturated():
+            self.rejected += 1
+            raise self.busy_error()
+        self.queued += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.queued -= 1
+        self.inflight += 1
+
+    def _release(self, ok: bool):
+        if ok:
+            self.completed += 1
+        else:
+            self.failed += 1
+        self.inflight -= 1
+        self._semaphore.release()
+
+    @staticmethod
+    def _payload(prompt: str, filters: Optional[str]) -> dict:
+        payload = {"prompt": prompt}
+        if filters:
+            payload["filters"] = filters
+        return payload
+
+    async def answer(self, prompt: str, filters: Optional[str] = None) -> dict:
+        """POST a prompt to /v2/answer and return the parsed JSON body."""
+        await self._acquire()
+        ok = False
+        try:
+            async with self.client().stream(
+                "POST", self.url, json=self._payload(prompt, filters)
+            ) as response:
+                response.raise_for_status()
+                body = b"".join([chunk async for chunk in response.aiter_bytes()])
+            ok = True
+            return json.loads(body)
+        finally:
+            self._release(ok)
+
+    async def stream_answer(self, prompt: str, filters: Optional[str] = None,
+                            upstream: Optional[dict] = None):
+        """
+        Yield answer text as it arrives from Pathway.
+        Relays chunks from a text/event-stream or plain-text upstream as they
+        are received. The current QASummaryRestServer answers with one JSON
+        body, so with it this only frames the finished answer as a single
+        chunk; its other fields (e.g. "sources") are copied into upstream.
+        """
+        await self._acquire()
+        ok = False
+        try:
+            async with self.client().stream(
+                "POST", self.url, json=self._payload(prompt, filters)
+            ) as response:
+                response.raise_for_status()
+                content_type = response.headers.get("content-type", "")
+                if "event-stream" in content_type:
+                    async for line in response.aiter_lines():
+                        if line.startswith("data:"):
+                            yield line[5:].lstrip()
+                elif "json" in content_type:
+                    data = json.loads(await response.aread())
+                    if isinstance(data, dict):
+                        if upstream is not None:
+                            upstream.update(data)
+                        yield data.get("response", "No response from RAG")
+                    else:
+                        yield str(data)
+                else:
+                    async for text in response.aiter_text():
+                        yield text
+            ok = True
+        finally:
+            self._release(ok)
+
+    def metrics(self) -> dict:
+        return {
+            "inflight": self.inflight,
+            "queued": self.queued,
+            "maxInflight": self.max_inflight,
+            "maxQueue": self.max_queue,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+        }
+
+
+pathway_proxy = PathwayProxy(PATHWAY_URL, CHAT_MAX_INFLIGHT, CHAT_MAX_QUEUE, PATHWAY_TIMEOUT)
+
+
+@app.on_event("shutdown")
+async def close_pathway_proxy():
+    await pathway_proxy.close()
+
+
+class AnswerCache:
+    """
+    LRU + TTL cache of chat answers.
+    Keys include the incident-set version, and the whole cache is dropped
+    when the Pathway poller publishes a new version, so answers never go stale.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self.version: Optional[str] = None
+        self.hits = 0
+        self.misses = 0
+
+    def set_version(self, version: Optional[str]):
+        if version != self.version:
+            if self._entries:
+                logger.info(f"🧹 Incident set changed ({self.version} → {version}), clearing answer cache")
+            self._entries.clear()
+            self.version = version
+
+    def get(self, key: tuple) -> Optional[dict]:
+        entry = self._entries.get(key)
+        if entry is None or time.monotonic() - entry[0] > self.ttl:
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, key: tuple, value: dict):
+        self._entries[key] = (time.monotonic(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def metrics(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "version": self.version,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hitRate": round(self.hits / total, 3) if total else 0.0,
+        }
+
+
+class SemanticCache:
+    """
+    Nearest-neighbour cache over recently answered queries.
+    Queries are embedded with the same MiniLM model as the Pathway index and a
+    cached answer is served when cosine similarity clears the threshold, the
+    query's retrieval filter (location, severity, status, time window) is the
+    same as the cached one's, and the incident-set version is unchanged.
+    Disabled when sentence-transformers is not installed.
+    """
+
+    def __init__(self, model_name: str, threshold: float, max_size: int):
+        self.model_name = model_name
+        self.threshold = threshold
+        self.enabled = (
+            SEMANTIC_CACHE_ENABLED
+            and importlib.util.find_spec("sentence_transformers") is not None
+        )
+        self._model = None
+        self._entries: deque = deque(maxlen=max_size)  # (vector, filters, answer, latency_ms)
+        self._embed = lru_cache(maxsize=max_size)(self._encode)
+        self.version: Optional[str] = None
+        self.hits = 0
+        self.misses = 0
+        self.saved_latency_ms = 0.0
+
+    def _encode(self, text: str):
+        if self._model is None:
+            from sentence_transformers import SentenceTransformer
+            self._model = SentenceTransformer(self.model_name)
+        return self._model.encode(text, normalize_embeddings=True)
+
+    def set_version(self, version: Optional[str]):
+        if version != self.version:
+            self._entries.clear()
+            self.version = version
+
+    async def get(self, text: str, version: str, filters: Optional[str]) -> Optional[dict]:
+        if not self.enabled or version != self.version or not self._entries:
+            return None
+        vector = await asyncio.to_thread(self._embed, text)
+        best_score, best = 0.0, None
+        for cached_vector, cached_filters, answer, latency_ms in self._entries:
+            # "open critical in Block A" embeds close to "closed critical in Block B"
+            if cached_filters != filters:
+                continue
+            score = float(vector @ cached_vector)
+            if score > best_score:
+                best_score, best = score, (answer, latency_ms)
+        if best is None or best_score < self.threshold:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.saved_latency_ms += best[1]
+        return best[0]
+
+    async def put(self, text: str, version: str, filters: Optional[str], answer: dict,
+                  latency_ms: float):
+        if not self.enabled or version != self.version:
+            return
+        vector = await asyncio.to_thread(self._embed, text)
+        self._entries.append((vector, filters, answer, latency_ms))
+
+    def metrics(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "model": self.model_name,
+            "threshold": self.threshold,
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hitRate": round(self.hits / total, 3) if total else 0.0,
+            "savedLatencyMs": round(self.saved_latency_ms, 1),
+        }
+
+
+answer_cache = AnswerCache(ANSWER_CACHE_SIZE, ANSWER_CACHE_TTL)
+semantic_cache = SemanticCache(SEMANTIC_CACHE_MODEL, SEMANTIC_CACHE_THRESHOLD, SEMANTIC_CACHE_SIZE)
+_version_checked_at = 0.0
+
+
+async def get_incidents_version(force: bool = False) -> Optional[str]:
+    """
+    Current incident-set version published by the Pathway poller.
+    Re-checked at most every INCIDENTS_VERSION_TTL seconds (unless forced);
+    None if unknown.
+    """
+    global _version_checked_at
+    now = time.monotonic()
+    if not force and now - _version_checked_at < INCIDENTS_VERSION_TTL:
+        return answer_cache.version
+    _version_checked_at = now
     try:
+        resp = await get_http_client().get(PATHWAY_VERSION_URL, timeout=1)
+        resp.raise_for_status()
+        version = resp.json().get("version") or None
+    except Exception:
+        version = None
+    answer_cache.set_version(version)
+    semantic_cache.set_version(version)
+    return version
+
+
+def prompt_history(request: ChatRequest) -> tuple:
+    """The history window build_chat_prompt() puts into the prompt, as a hashable key part."""
+    return tuple((m.sender.lower(), m.message) for m in request.history[-6:])
+
+
+def answer_cache_key(message: str, version: str, filters: Optional[str] = None,
+                     history: tuple = ()) -> tuple:
+    """
+    Normalize the enhanced query so trivially different phrasings share a key.
+    The retrieval filter and the prompt history are part of the key: the
+    expansion drops locations, so "critical in Block A" and "critical in
+    Block B" normalize alike, and follow-ups depend on the conversation.
+    """
+    normalized = re.sub(r'\s+', ' ', enhance_query(message).lower())
+    return (normalized.strip(" ?!.,"), version, filters, history)
+
+
+async def lookup_answer(message: str, filters: Optional[str], history: tuple = ()):
+    """
+    Check the exact, then the semantic answer cache.
+    Returns (cache_key, cached_answer); cache_key is None when the incident
+    version is unknown and nothing should be cached.
+    """
+    version = await get_incidents_version()
+    if not version:
+        return None, None
+    cache_key = answer_cache_key(message, version, filters, history)
+    cached = answer_cache.get(cache_key)
+    # Similarity is judged on the message alone, so follow-ups skip it
+    if cached is None and not history:
+        cached = await semantic_cache.get(cache_key[0], version, filters)
+    return cache_key, cached
+
+
+async def store_answer(cache_key: Optional[tuple], answer: dict, latency_ms: float):
+    """
+    Record a fresh Pathway answer in both caches, unless the incident set
+    changed while Pathway was answering (the answer may predate the change).
+    """
+    if cache_key is None:
+        return
+    if await get_incidents_version(force=True) != cache_key[1]:
+        return
+    answer_cache.put(cache_key, answer)
+    if not cache_key[3]:
+        await semantic_cache.put(cache_key[0], cache_key[1], cache_key[2], answer, latency_ms)
+
+
+@app.get("/api/chat/metrics")
+async def chat_metrics():
+    """Pathway proxy queue depth, outcome counters and answer cache stats."""
+    return {
+        **pathway_proxy.metrics(),
+        "answerCache": answer_cache.metrics(),
+        "semanticCache": semantic_cache.metrics(),
+        "coalescing": chat_flights.metrics(),
+    }
+
+
+def build_chat_prompt(request: ChatRequest) -> str:
+    """Build the enhanced RAG prompt (field semantics + history + query)."""
     # Phase 1: Deterministic query enhancement
-        enhanced_user_query = enhance_query(request.message)
-        
-        # Build conversation history string
-        history_context = ""
-        if request.history:
-            # Use last 6 messages (3 turns)
-            for msg in request.history[-6:]:
-                role = "User" if msg.sender.lower() == "user" else "AI"
-                history_context += f"{role}: {msg.message}\n"
-        
-        # Phase 1: Improved prompt with field semantics explanation
-        enhanced_prompt = f"""Context: You have access to incident records with these fields:
+    enhanced_user_query = enhance_query(request.message)
+    
+    # Build conversation history string
+    history_context = ""
+    if request.history:
+        # Use last 6 messages (3 turns)
+        for msg in request.history[-6:]:
+            role = "User" if msg.sender.lower() == "user" else "AI"
+            history_context += f"{role}: {msg.message}\n"
+    
+    # Phase 1: Improved prompt with field semantics explanation
+    return f"""Context: You have access to incident records with these fields:
 - incident_id: Unique ID in format INC-YYYYMMDD-HHMMSS (always cite this)
 - title: Short description of the incident
 - status: Current state (open, investigating, resolved, closed)
@@ -689,64 +2030,178 @@ NEVER use legacy ID formats like INC-101, INC-102, or INC-1102.
 User query: {enhanced_user_query}
 
 Please provide an accurate, complete answer citing incident IDs and exact field values."""
-        
-        pathway_response = requests.post(
-            PATHWAY_URL,
-            json={"prompt": enhanced_prompt},
-            timeout=120  # Increased for Groq cloud latency
-        )
-        pathway_response.raise_for_status()
-        data = pathway_response.json()
-        
-        # Extract incident references from response
-        response_text = data.get("response", "No response from RAG")
-        incident_refs = []
-        context_size = None
-        
-        # Transitional regex: Support both formats but LOG legacy detections
-        import re
-        
-        # Check for canonical IDs (preferred)
-        canonical_pattern = r'INC-\d{8}-\d{6}'
-        canonical_matches = re.findall(canonical_pattern, response_text)
-        
+
+
+# Transitional regex: Support both formats but LOG legacy detections
+CANONICAL_ID_PATTERN = re.compile(r'INC-\d{8}-\d{6}')
+LEGACY_ID_PATTERN = re.compile(r'INC-\d{1,4}(?!\d)')  # INC-101, INC-1102, etc.
+INCIDENT_KEYWORDS = ['incident', 'severity:', 'status:', 'location:']
+
+
+class IncidentRefTracker:
+    """
+    Incrementally extracts incident references from answer text.
+    Keeps a short tail between chunks so IDs split across tokens still match.
+    """
+
+    _TAIL = len("INC-YYYYMMDD-HHMMSS")
+
+    def __init__(self):
+        self.refs: List[str] = []
+        self._parts: List[str] = []
+        self._tail = ""
+
+    def feed(self, delta: str):
+        if not delta:
+            return
+        self._parts.append(delta)
+        text = self._tail + delta
+        for match in CANONICAL_ID_PATTERN.finditer(text):
+            if match.end() > len(self._tail) and match.group() not in self.refs:
+                self.refs.append(match.group())
+        self._tail = text[-self._TAIL:]
+
+    def context_size(self, data: Optional[dict] = None) -> Optional[int]:
+        if self.refs:
+            return len(self.refs)
+        # Fallback 1: Check if Pathway returns metadata
+        if data and 'sources' in data:
+            return len(data.get('sources', []))
+        # Fallback 2: Estimate from response content using heuristics
+        response_lower = "".join(self._parts).lower()
+        keyword_count = sum(response_lower.count(kw) for kw in INCIDENT_KEYWORDS)
+        if keyword_count > 10:
+            return max(1, keyword_count // 4)
+        return None
+
+    def log_legacy(self, query: str):
         # Check for legacy IDs (should not exist)
-        legacy_pattern = r'INC-\d{1,4}(?!\d)'  # INC-101, INC-1102, etc.
-        legacy_matches = re.findall(legacy_pattern, response_text)
-        
+        legacy_matches = LEGACY_ID_PATTERN.findall("".join(self._parts))
         if legacy_matches:
             # LOG WARNING: Legacy IDs detected in AI response
             logger.warning(f"⚠️  LEGACY IDS IN AI RESPONSE: {legacy_matches}")
-            logger.warning(f"   Query was: {request.message}")
+            logger.warning(f"   Query was: {query}")
             logger.warning(f"   This indicates stale Pathway cache or database inconsistency!")
-        
-        if canonical_matches:
-            incident_refs = list(set(canonical_matches))
-            context_size = len(incident_refs)
-        
-        # Fallback 1: Check if Pathway returns metadata
-        if context_size is None and 'sources' in data:
-            context_size = len(data.get('sources', []))
-        
-        # Fallback 2: Estimate from response content using heuristics
-        if context_size is None:
-            incident_keywords = ['incident', 'severity:', 'status:', 'location:']
-            keyword_count = sum(response_text.lower().count(kw) for kw in incident_keywords)
-            if keyword_count > 10:
-                context_size = max(1, keyword_count // 4)
-        
-        # Detect query mode (search vs reasoning)
-        query_mode = detect_query_mode(request.message)
-        
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical chat requests onto one Pathway call.
+    The first caller for a key leads; later callers await the leader's
+    future and receive the same answer (or the same error).
+    """
+
+    def __init__(self):
+        self._inflight: Dict[tuple, asyncio.Future] = {}
+        self.leaders = 0
+        self.followers = 0
+
+    def join(self, key: tuple) -> Optional[asyncio.Future]:
+        future = self._inflight.get(key)
+        if future is not None:
+            self.followers += 1
+        return future
+
+    def lead(self, key: tuple, coro) -> asyncio.Future:
+        """Register a leader running `coro` as a task; callers should await it shielded."""
+        future = asyncio.ensure_future(coro)
+        self._inflight[key] = future
+        self.leaders += 1
+        future.add_done_callback(lambda f: self._release(key, f))
+        return future
+
+    def _release(self, key: tuple, future: asyncio.Future):
+        if self._inflight.get(key) is future:
+            del self._inflight[key]
+        if not future.cancelled():
+            future.exception()  # Mark retrieved; waiters re-raise it themselves
+
+    async def do(self, key: tuple, make_coro):
+        future = self.join(key)
+        if future is None:
+            future = self.lead(key, make_coro())
+        # Shield so a disconnecting caller does not cancel the shared call
+        return await asyncio.shield(future)
+
+    def metrics(self) -> dict:
+        return {
+            "inflight": len(self._inflight),
+            "leaders": self.leaders,
+            "followers": self.followers,
+        }
+
+
+chat_flights = SingleFlight()
+
+
+def chat_flight_key(request: ChatRequest, filters: Optional[str]) -> tuple:
+    """Normalized query, retrieval filter and the history window that goes into the prompt."""
+    return (answer_cache_key(request.message, "")[0], filters, prompt_history(request))
+
+
+async def answer_from_pathway(request: ChatRequest, cache_key: Optional[tuple],
+                              filters: Optional[str]) -> dict:
+    """Run one full RAG round trip and cache the result."""
+    started = time.monotonic()
+    data = await pathway_proxy.answer(build_chat_prompt(request), filters)
+    latency_ms = (time.monotonic() - started) * 1000
+    
+    # Extract incident references from response
+    response_text = data.get("response", "No response from RAG")
+    tracker = IncidentRefTracker()
+    tracker.feed(response_text)
+    tracker.log_legacy(request.message)
+    
+    answer = {
+        "response": response_text,
+        "mode": detect_query_mode(request.message),  # Dynamic: "search" or "reasoning"
+        "dataSource": "Supabase",
+        "contextSize": tracker.context_size(data),
+        "incidentRefs": tracker.refs or None,
+    }
+    await store_answer(cache_key, answer, latency_ms)
+    return answer
+
+
+@app.post("/api/chat", response_model=ChatResponse)
+async def chat(request: ChatRequest):
+    """Chat with Pathway RAG."""
+    
+    # Check for greeting
+    greeting_response = detect_greeting_intent(request.message)
+    if greeting_response:
         return ChatResponse(
-            response=response_text,
-            timestamp=datetime.now().isoformat(),
-            mode=query_mode,  # Dynamic: "search" or "reasoning"
-            dataSource="Supabase",
-            contextSize=context_size,
-            incidentRefs=incident_refs if incident_refs else None
+            response=greeting_response,
+            timestamp=datetime.now().isoformat()
+        )
+    
+    # Read-your-writes: wait for the caller's last write to be indexed
+    if request.consistencyToken:
+        await wait_for_consistency(request.consistencyToken)
+        await get_incidents_version(force=True)
+    
+    # Filter-style search queries: answer exactly from the incident index
+    structured = await answer_structured_query(request.message)
+    if structured:
+        return ChatResponse(timestamp=datetime.now().isoformat(), **structured)
+    
+    # Answer caches: only valid while the incident set is unchanged
+    filters = await retrieval_filter_for(request.message)
+    cache_key, cached = await lookup_answer(request.message, filters, prompt_history(request))
+    if cached:
+        return ChatResponse(timestamp=datetime.now().isoformat(), **cached)
+    
+    # Not a greeting - forward to Pathway RAG, sharing identical in-flight calls
+    try:
+        answer = await chat_flights.do(
+            chat_flight_key(request, filters),
+            lambda: answer_from_pathway(request, cache_key, filters)
         )
-    except requests.exceptions.ConnectionError:
+        return ChatResponse(timestamp=datetime.now().isoformat(), **answer)
+    except HTTPException:
+        # Saturated proxy: surface the 503 + Retry-After to the client
+        raise
+    except httpx.ConnectError:
         return ChatResponse(
             response="Error: Cannot connect to Pathway RAG. Is it running on port 8081?",
             timestamp=datetime.now().isoformat(),
@@ -762,6 +2217,118 @@ Please provide an accurate, complete answer citing incident IDs and exact field
         )
 
 
+async def stream_from_pathway(request: ChatRequest, cache_key: Optional[tuple],
+                              filters: Optional[str], deltas: asyncio.Queue) -> dict:
+    """
+    Stream one RAG answer into `deltas` (None marks the end) and cache it.
+    Runs as the shared flight task, so it outlives the leader's client.
+    """
+    try:
+        tracker = IncidentRefTracker()
+        parts = []
+        upstream: dict = {}
+        started = time.monotonic()
+        async for delta in pathway_proxy.stream_answer(build_chat_prompt(request), filters, upstream):
+            tracker.feed(delta)
+            parts.append(delta)
+            deltas.put_nowait(delta)
+        tracker.log_legacy(request.message)
+        answer = {
+            "response": "".join(parts),
+            "mode": detect_query_mode(request.message),
+            "dataSource": "Supabase",
+            "contextSize": tracker.context_size(upstream),
+            "incidentRefs": tracker.refs or None,
+        }
+        latency_ms = (time.monotonic() - started) * 1000
+        await store_answer(cache_key, answer, latency_ms)
+        return answer
+    finally:
+        deltas.put_nowait(None)
+
+
+def sse_event(event: str, data: dict) -> str:
+    """Format one Server-Sent Event."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@app.post("/api/chat/stream")
+async def chat_stream(request: ChatRequest):
+    """
+    Chat over Server-Sent Events: `token` events with answer text, then one
+    trailing `meta` event carrying the ChatResponse fields (refs,
+    contextSize, mode). Pathway's /v2/answer returns the finished answer,
+    so this is framing only: the answer arrives as a single `token` event
+    and time to first token matches /api/chat. A streaming upstream
+    (text/event-stream) would be relayed chunk by chunk.
+    """
+    greeting_response = detect_greeting_intent(request.message)
+    cache_key = cached = flight = deltas = filters = None
+    if greeting_response is None and request.consistencyToken:
+        await wait_for_consistency(request.consistencyToken)
+        await get_incidents_version(force=True)
+    if greeting_response is None:
+        cached = await answer_structured_query(request.message)
+    if greeting_response is None and cached is None:
+        filters = await retrieval_filter_for(request.message)
+        cache_key, cached = await lookup_answer(request.message, filters, prompt_history(request))
+        if cached is None:
+            # join and lead run without an await in between, so exactly one
+            # request starts the upstream call; it runs as its own task and
+            # a client abort only cancels that client's relay below
+            key = chat_flight_key(request, filters)
+            flight = chat_flights.join(key)
+            if flight is None:
+                if pathway_proxy.saturated():
+                    raise pathway_proxy.busy_error()
+                deltas = asyncio.Queue()
+                flight = chat_flights.lead(key, stream_from_pathway(request, cache_key, filters, deltas))
+
+    async def events():
+        if greeting_response:
+            yield sse_event("token", {"text": greeting_response})
+            yield sse_event("meta", {
+                "timestamp": datetime.now().isoformat(),
+                "mode": "reasoning",
+                "dataSource": "Supabase",
+                "contextSize": None,
+                "incidentRefs": None,
+            })
+            return
+
+        try:
+            if cached is not None:
+                meta = {k: v for k, v in cached.items() if k != "response"}
+                yield sse_event("token", {"text": cached["response"]})
+                yield sse_event("meta", {"timestamp": datetime.now().isoformat(), **meta})
+                return
+
+            if deltas is not None:
+                # Leader: relay deltas as the flight task produces them
+                while (delta := await deltas.get()) is not None:
+                    yield sse_event("token", {"text": delta})
+            answer = await asyncio.shield(flight)
+            if deltas is None:
+                # Identical question already in flight: send its answer whole
+                yield sse_event("token", {"text": answer["response"]})
+            meta = {k: v for k, v in answer.items() if k != "response"}
+            yield sse_event("meta", {"timestamp": datetime.now().isoformat(), **meta})
+        except HTTPException as e:
+            yield sse_event("error", {"message": e.detail, "retryAfter": CHAT_RETRY_AFTER})
+        except httpx.ConnectError:
+            yield sse_event("error", {
+                "message": "Cannot connect to Pathway RAG. Is it running on port 8081?"
+            })
+        except Exception as e:
+            yield sse_event("error", {"message": str(e)})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @app.get("/api/live-updates")
 async def get_live_updates():
     """Get recent live updates (placeholder)."""
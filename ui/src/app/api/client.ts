@@ -12,31 +12,62 @@ const WS_INCIDENTS_URL = `${WS_URL}/ws/incidents`;
 class APIClient {
     private ws: WebSocket | null = null;
     private wsCallbacks: ((data: any) => void)[] = [];
+    // Token from our last write; chat waits until the AI can see that write
+    private consistencyToken: string | null = null;
+    // Change-log version token ("<epoch>:<n>") of the incident list we hold (for delta sync)
+    private changesVersion: string | null = null;
+
+    private parseIncident(inc: any): Incident {
+        return {
+            ...inc,
+            createdAt: new Date(inc.createdAt),
+            updatedAt: new Date(inc.updatedAt),
+            timeline: inc.timeline || [],
+            aiInsights: inc.aiInsights || []
+        };
+    }
 
     // Fetch all incidents from Pathway (via FastAPI proxy)
     async getIncidents(): Promise<Incident[]> {
         try {
             const response = await fetch(`${API_BASE_URL}/api/incidents`);
             if (!response.ok) return [];
+            const version = response.headers.get('X-Changes-Version');
+            this.changesVersion = version;
             const data = await response.json();
-            return data.map((inc: any) => ({
-                ...inc,
-                createdAt: new Date(inc.createdAt),
-                updatedAt: new Date(inc.updatedAt),
-                timeline: inc.timeline || [],
-                aiInsights: inc.aiInsights || []
-            }));
+            return data.map((inc: any) => this.parseIncident(inc));
         } catch (error) {
             console.error('Failed to fetch incidents:', error);
             return [];
         }
     }
 
-    // Fetch a specific incident
-    // NOTE: Individual incidents come via AI chat responses now
+    // Incidents changed since our last fetch; null means reload the full list
+    async getIncidentChanges(): Promise<{ upserts: Incident[]; deletes: string[] } | null> {
+        if (this.changesVersion === null) return null;
+        const response = await fetch(
+            `${API_BASE_URL}/api/incidents/changes?since=${encodeURIComponent(this.changesVersion)}`
+        );
+        if (!response.ok) return null;
+        const data = await response.json();
+        if (data.resync) return null;
+        this.changesVersion = data.version;
+        return {
+            upserts: data.upserts.map((inc: any) => this.parseIncident(inc)),
+            deletes: data.deletes
+        };
+    }
+
+    // Fetch a specific incident (served from the backend's in-memory cache)
     async getIncident(id: string): Promise<Incident | null> {
-        // Individual incidents are accessed through AI chat
-        return null;
+        try {
+            const response = await fetch(`${API_BASE_URL}/api/incidents/${encodeURIComponent(id)}`);
+            if (!response.ok) return null;
+            return this.parseIncident(await response.json());
+        } catch (error) {
+            console.error('Failed to fetch incident:', error);
+            return null;
+        }
     }
 
     // Send chat message and get AI response
@@ -46,10 +77,11 @@ class APIClient {
             headers: {
                 'Content-Type': 'application/json',
             },
-            body: JSON.stringify({ message, history }),
+            body: JSON.stringify({ message, history, consistencyToken: this.consistencyToken }),
         });
 
         if (!response.ok) throw new Error('Failed to send message');
+        this.consistencyToken = null;
         const data = await response.json();
 
         return {
@@ -64,6 +96,67 @@ class APIClient {
         };
     }
 
+    // Chat over SSE; onToken receives the text so far (one event per answer until Pathway streams)
+    async streamChatMessage(
+        message: string,
+        history: ChatMessage[] = [],
+        onToken: (text: string) => void
+    ): Promise<ChatMessage> {
+        const response = await fetch(`${API_BASE_URL}/api/chat/stream`, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+            },
+            body: JSON.stringify({ message, history, consistencyToken: this.consistencyToken }),
+        });
+
+        if (!response.ok || !response.body) throw new Error('Failed to send message');
+        this.consistencyToken = null;
+
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        let text = '';
+        let meta: any = {};
+
+        while (true) {
+            const { done, value } = await reader.read();
+            if (done) break;
+            buffer += decoder.decode(value, { stream: true });
+
+            // SSE events are separated by a blank line
+            let boundary = buffer.indexOf('\n\n');
+            while (boundary !== -1) {
+                const raw = buffer.slice(0, boundary);
+                buffer = buffer.slice(boundary + 2);
+                boundary = buffer.indexOf('\n\n');
+
+                const event = raw.match(/^event: (.*)$/m)?.[1];
+                const data = JSON.parse(raw.match(/^data: (.*)$/m)?.[1] || '{}');
+                if (event === 'token') {
+                    text += data.text;
+                    onToken(text);
+                } else if (event === 'meta') {
+                    meta = data;
+                } else if (event === 'error') {
+                    text = `Error: ${data.message}`;
+                    onToken(text);
+                }
+            }
+        }
+
+        return {
+            id: `ai-${Date.now()}`,
+            sender: 'ai',
+            message: text,
+            timestamp: meta.timestamp ? new Date(meta.timestamp) : new Date(),
+            incidentRefs: meta.incidentRefs,
+            mode: meta.mode,
+            dataSource: meta.dataSource,
+            contextSize: meta.contextSize
+        };
+    }
+
     // Get live updates
     async getLiveUpdates(): Promise<LiveUpdate[]> {
         const response = await fetch(`${API_BASE_URL}/api/live-updates`);
@@ -128,6 +221,7 @@ class APIClient {
 
         if (!response.ok) throw new Error('Failed to create incident');
         const incident = await response.json();
+        this.consistencyToken = incident.consistencyToken || null;
         return {
             ...incident,
             createdAt: new Date(incident.createdAt),
@@ -157,6 +251,7 @@ class APIClient {
 
         if (!response.ok) throw new Error('Failed to update incident');
         const incident = await response.json();
+        this.consistencyToken = incident.consistencyToken || null;
         return {
             ...incident,
             createdAt: new Date(incident.createdAt),
@@ -175,6 +270,8 @@ class APIClient {
         });
 
         if (!response.ok) throw new Error('Failed to delete incident');
+        const result = await response.json();
+        this.consistencyToken = result.consistencyToken || null;
     }
 
     // Search incidents by keyword
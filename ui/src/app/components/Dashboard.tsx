@@ -38,12 +38,10 @@ export function Dashboard() {
       if (data.type === 'connected') {
         console.log('WebSocket connected to incidents');
       }
-      if (data.type === 'incident_created' || data.type === 'incident_updated' || data.type === 'incident_deleted') {
-        // Incident changed, trigger refresh after Pathway polls (5s delay)
-        setTimeout(() => {
-          loadData();
-          setIsSyncing(false);
-        }, 5500);
+      if (data.type === 'incident_created' || data.type === 'incident_updated' ||
+          data.type === 'incident_deleted' || data.type === 'incidents_changed') {
+        // Incident changed: fetch only the delta (full reload if we fell behind)
+        syncChanges().finally(() => setIsSyncing(false));
       }
     });
 
@@ -52,6 +50,19 @@ export function Dashboard() {
     };
   }, []);
 
+  const syncChanges = async () => {
+    const changes = await apiClient.getIncidentChanges().catch(() => null);
+    if (!changes) {
+      await loadData();
+      return;
+    }
+    if (!changes.upserts.length && !changes.deletes.length) return;
+    const removed = new Set([...changes.deletes, ...changes.upserts.map(inc => inc.id)]);
+    setIncidents(prev => [...changes.upserts, ...prev.filter(inc => !removed.has(inc.id))]
+      .sort((a, b) => b.createdAt.getTime() - a.createdAt.getTime()));
+    apiClient.getLiveUpdates().then(setLiveUpdates).catch(() => {});
+  };
+
   const loadData = async () => {
     try {
       const [incidentsData, updatesData] = await Promise.all([
@@ -81,11 +92,18 @@ export function Dashboard() {
     };
     setChatMessages(prev => [...prev, userMessage]);
 
+    // Placeholder AI message filled in as tokens stream in
+    const aiId = `ai-${Date.now()}`;
+    setChatMessages(prev => [...prev, { id: aiId, sender: 'ai', message: '', timestamp: new Date() }]);
+
     try {
-      // Get AI response from backend with history
-      const aiResponse = await apiClient.sendChatMessage(message, chatMessages);
-      setChatMessages(prev => [...prev, aiResponse]);
+      // Stream AI response from backend with history
+      const aiResponse = await apiClient.streamChatMessage(message, chatMessages, (text) => {
+        setChatMessages(prev => prev.map(m => m.id === aiId ? { ...m, message: text } : m));
+      });
+      setChatMessages(prev => prev.map(m => m.id === aiId ? { ...aiResponse, id: aiId } : m));
     } catch (error) {
+      setChatMessages(prev => prev.filter(m => m.id !== aiId));
       console.error('Failed to send message:', error);
       toast.error('Failed to get AI response');
     }